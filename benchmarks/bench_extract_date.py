@@ -0,0 +1,74 @@
+"""
+Per-row cost of date extraction and to_sheets_row on synthetic transactions.
+
+    python -m benchmarks.bench_extract_date --transactions 50000
+"""
+
+import argparse
+import time
+
+import dateutil.parser
+
+from sbankensheets.sbanken import Transaction
+from sbankensheets.sbanken.fake_server import generate_transactions
+from sbankensheets.sbanken.transaction import parse_date
+
+
+def timed(name: str, rows: int, run):
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<36} {rows:>8} rows {elapsed:8.3f} s {elapsed / rows * 1e6:8.2f} us/row"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=50000)
+    args = parser.parse_args()
+
+    data = generate_transactions(args.transactions)
+    timestamps = [
+        (
+            transaction["cardDetails"]["purchaseDate"]
+            if transaction["cardDetailsSpecified"]
+            else transaction["accountingDate"]
+        )
+        for transaction in data
+    ]
+    rows = len(timestamps)
+
+    timed(
+        "dateutil.parser.parse",
+        rows,
+        lambda: [dateutil.parser.parse(t).date().isoformat() for t in timestamps],
+    )
+    parse_date.cache_clear()
+    timed(
+        "parse_date (uncached)",
+        rows,
+        lambda: [parse_date.__wrapped__(t).isoformat() for t in timestamps],
+    )
+    timed("parse_date (memoized)", rows, lambda: [parse_date(t) for t in timestamps])
+
+    parse_date.cache_clear()
+    transactions = [Transaction(transaction) for transaction in data]
+    timed(
+        "Transaction.extract_date",
+        rows,
+        lambda: [transaction.extract_date() for transaction in transactions],
+    )
+
+    transactions = [Transaction(transaction) for transaction in data]
+    timed(
+        "Transaction.to_sheets_row",
+        rows,
+        lambda: [
+            transaction.to_sheets_row(encode=True) for transaction in transactions
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
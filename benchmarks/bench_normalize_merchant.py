@@ -0,0 +1,66 @@
+"""
+Cost of merchant normalization against what it saves in categorize_many.
+
+    python -m benchmarks.bench_normalize_merchant --transactions 100000
+"""
+
+import argparse
+import time
+
+from sbankensheets.categorize import Categorizer, Category
+from sbankensheets.sbanken import Transaction
+from sbankensheets.sbanken.fake_server import generate_transactions
+
+categories = [
+    Category("Dagligvare", keywords=["rema", "kiwi", "coop", "narvesen"]),
+    Category("Abonnement", 109, "-", keywords=["spotify?", "netflix"]),
+    Category("Transport", keywords=["ruter", "vy"]),
+    Category("Strøm", keywords=["fjordkraft"]),
+    Category("Annet", keywords=["*"]),
+]
+
+
+def timed(name: str, run):
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {elapsed * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    args = parser.parse_args()
+
+    data = generate_transactions(args.transactions, days=3 * 365)
+
+    def fresh():
+        return [Transaction(transaction) for transaction in data]
+
+    print(f"{len(data)} transactions")
+    transactions = fresh()
+    categorizer = Categorizer(categories)
+    timed(
+        "categorize (no memo)",
+        lambda: [categorizer.categorize(t) for t in transactions],
+    )
+    transactions = fresh()
+    timed(
+        "categorize_many (text)",
+        lambda: Categorizer(categories).categorize_many(transactions),
+    )
+    transactions = fresh()
+    keys = timed("Transaction.merchant", lambda: {t.merchant for t in transactions})
+    transactions = fresh()
+    timed(
+        "categorize_many (merchant)",
+        lambda: Categorizer(categories, normalize=True).categorize_many(transactions),
+    )
+    print(
+        f"{len({t.text for t in transactions})} unique texts, {len(keys)} merchant keys"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+End to end throughput of the Sbanken sessions against the local fake server.
+
+    python -m benchmarks.bench_sbanken_session --transactions 20000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import date
+
+from sbankensheets.sbanken import AsyncSbankenSession, RequestScheduler, SbankenSession
+from sbankensheets.sbanken.fake_server import FakeSbankenServer
+
+
+def timed(name: str, count_transactions):
+    start = time.perf_counter()
+    count = count_transactions()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<36} {count:>8} transactions {elapsed:8.3f} s {count / elapsed:10.0f} /s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    end_date = date.today()
+    start_date = date(end_date.year - 1, end_date.month, 1).isoformat()
+
+    with FakeSbankenServer(
+        accounts=args.accounts,
+        transactions_per_account=args.transactions,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        end_date=end_date,
+    ) as server:
+        os.environ.update(
+            {
+                "CLIENT_ID": "bench-client-id",
+                "CLIENT_SECRET": "bench-client-secret",
+                "CUSTOMER_ID": server.customer_id,
+                "OAUTHLIB_INSECURE_TRANSPORT": "1",
+            }
+        )
+        urls = dict(api_url=server.api_url, token_url=server.token_url)
+        scheduler = RequestScheduler(rate=1000, burst=100, backoff_base=0.01)
+        sbanken = SbankenSession(scheduler=scheduler, **urls)
+        account_ids = [account["accountId"] for account in sbanken.get_accounts()]
+
+        def run(fetch):
+            return lambda: sum(
+                len(list(fetch(account_id))) for account_id in account_ids
+            )
+
+        kwargs = dict(start_date=start_date, page_size=args.page_size)
+        timed(
+            "get_transactions (one page)",
+            run(
+                lambda account_id: sbanken.get_transactions(
+                    account_id, length=args.page_size, start_date=start_date
+                )
+            ),
+        )
+        timed(
+            "get_all_transactions (serial)",
+            run(
+                lambda account_id: sbanken.get_all_transactions(
+                    account_id, max_workers=1, **kwargs
+                )
+            ),
+        )
+        timed(
+            "get_all_transactions (parallel)",
+            run(lambda account_id: sbanken.get_all_transactions(account_id, **kwargs)),
+        )
+        timed(
+            "iter_all_transactions (stream)",
+            run(lambda account_id: sbanken.iter_all_transactions(account_id, **kwargs)),
+        )
+        timed(
+            "backfill_transactions (month)",
+            run(
+                lambda account_id: sbanken.backfill_transactions(
+                    account_id, start_date, page_size=args.page_size
+                )
+            ),
+        )
+
+        async def fetch_all_accounts():
+            async with AsyncSbankenSession(scheduler=scheduler, **urls) as session:
+                accounts = await session.get_accounts()
+                results = await session.get_transactions_for_accounts(
+                    accounts, start_date=start_date
+                )
+                return sum(map(len, results.values()))
+
+        timed(
+            "AsyncSbankenSession (all accounts)",
+            lambda: asyncio.run(fetch_all_accounts()),
+        )
+
+        sbanken.close()
+        print(f"Scheduler: {scheduler.stats}")
+
+
+if __name__ == "__main__":
+    main()
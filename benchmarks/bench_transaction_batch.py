@@ -0,0 +1,57 @@
+"""
+Dividing and summarizing transactions with predicates versus a TransactionBatch.
+
+    python -m benchmarks.bench_transaction_batch --transactions 100000
+"""
+
+import argparse
+import time
+
+from sbankensheets.sbanken import Rule, Transaction, TransactionBatch
+from sbankensheets.sbanken import divide_transactions
+from sbankensheets.sbanken.fake_server import generate_transactions
+
+
+def timed(name: str, run):
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36} {elapsed * 1000:10.2f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100000)
+    args = parser.parse_args()
+
+    transactions = [
+        Transaction(transaction)
+        for transaction in generate_transactions(args.transactions, days=3 * 365)
+    ]
+    lambdas = (
+        ("expenses", lambda x: x.amount < 0 and x.transaction_type_code != 200),
+        ("income", lambda x: x.amount > 0 and x.transaction_type_code != 200),
+        ("savings", lambda x: x.amount < 0 and x.transaction_type_code == 200),
+    )
+    rules = (
+        ("expenses", Rule(sign=-1, exclude_type_codes=(200,))),
+        ("income", Rule(sign=1, exclude_type_codes=(200,))),
+        ("savings", Rule(sign=-1, type_codes=(200,))),
+    )
+
+    print(f"{len(transactions)} transactions")
+    timed(
+        "divide_transactions (lambdas)",
+        lambda: divide_transactions(transactions, lambdas),
+    )
+    timed(
+        "divide_transactions (rules)", lambda: divide_transactions(transactions, rules)
+    )
+    batch = timed("TransactionBatch (build)", lambda: TransactionBatch(transactions))
+    timed("TransactionBatch.divide", lambda: batch.divide(rules))
+    timed("TransactionBatch.summarize", lambda: batch.summarize(rules))
+
+
+if __name__ == "__main__":
+    main()
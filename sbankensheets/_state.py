@@ -0,0 +1,68 @@
+import fcntl
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Any
+
+
+def cache_dir() -> str:
+    """
+    Directory for state kept between runs. Can be overridden with the
+    SBANKENSHEETS_CACHE_DIR environment variable.
+    """
+    return os.environ.get(
+        "SBANKENSHEETS_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "sbankensheets"),
+    )
+
+
+def cache_path(filename: str) -> str:
+    return os.path.join(cache_dir(), filename)
+
+
+@contextmanager
+def locked(path: str):
+    """
+    Hold an exclusive lock on '<path>.lock' for the duration of the block,
+    serializing access to path across threads and processes.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def read_json(path: str, default: Any = None) -> Any:
+    """
+    Read a json file, returning default if it is missing or corrupt.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return default
+
+
+def write_json(path: str, data: Any, mode: int = 0o600):
+    """
+    Atomically replace path with data encoded as json.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
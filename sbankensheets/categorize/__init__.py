@@ -1,2 +1,3 @@
 from ._categorize import *
 from ._categorize import _categorize_uncertainty
+from .category_cache import *
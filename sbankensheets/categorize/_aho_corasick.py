@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class AhoCorasick(object):
+    """
+    Aho-Corasick automaton finding every occurrence of a set of patterns in a
+    single pass over the text, regardless of the number of patterns.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """
+        :param patterns: The patterns to search for. Pattern i is reported as i.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(patterns):
+            self._add(pattern, index)
+        self._build_fail_links()
+
+    def _add(self, pattern: str, index: int):
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(index)
+
+    def _build_fail_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                # Patterns ending at the fail node also end here
+                self._output[child] = (
+                    self._output[child] + self._output[self._fail[child]]
+                )
+
+    def find(self, text: str) -> Set[int]:
+        """
+        :param text: The text to search.
+        :return: The indices of the patterns occurring in text.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set(output[0])
+        node = 0
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
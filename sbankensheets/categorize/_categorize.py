@@ -1,8 +1,10 @@
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Iterable, List, Optional, Tuple
 
-from ..gsheets import GSheet, A1Range, find_cells
+from ..gsheets import AnchorLocator, GSheet, A1Range, find_cells
 from ..sbanken import Transaction
+from ._aho_corasick import AhoCorasick
 
 category_sheet = "Kategorier"
 
@@ -30,8 +32,17 @@ def process_category_values(values: List):
     )
 
 
-def get_categories(gsheet: GSheet):
-    cells = find_cells(gsheet, category_sheet, "Kategori")
+def get_categories(gsheet: GSheet, locator: AnchorLocator = None):
+    # Same rendering as the categories, so with use_snapshots the scan and the
+    # category reads share one read of the sheet
+    if locator:
+        cells = locator.find_cells(
+            category_sheet, "Kategori", value_render_option="UNFORMATTED_VALUE"
+        )
+    else:
+        cells = find_cells(
+            gsheet, category_sheet, "Kategori", value_render_option="UNFORMATTED_VALUE"
+        )
     if not cells:
         print("No cells found")
         return
@@ -39,16 +50,20 @@ def get_categories(gsheet: GSheet):
 
     categories = {"expenses": [], "income": [], "savings": []}
 
-    for transaction, category_cell in zip(
-        sorted(categories.keys()), (expenses, incomes, savings)
-    ):
+    category_ranges = []
+    for category_cell in (expenses, incomes, savings):
         end_cell = (category_cell + (3, 0))[0]
-        category_range = A1Range(
-            category_cell + (0, 2), end_cell=end_cell, sheet=category_sheet
-        )
-        category_cells = gsheet.get(
-            category_range, value_render_option="UNFORMATTED_VALUE"
+        category_ranges.append(
+            A1Range(category_cell + (0, 2), end_cell=end_cell, sheet=category_sheet)
         )
+
+    # Read every kind of category in one request
+    response = gsheet.get_batch(
+        category_ranges, value_render_option="UNFORMATTED_VALUE"
+    )
+    value_ranges = response.get("valueRanges", [])
+
+    for transaction, category_cells in zip(sorted(categories.keys()), value_ranges):
         if "values" not in category_cells:
             print("Values not in sheet")
             return
@@ -93,3 +108,114 @@ def categorize(transaction: Transaction, categories: List[Category]) -> Optional
             elif keyword == "*":
                 value = category.name
     return value
+
+
+class Categorizer(object):
+    """
+    Categorizes transactions like categorize, with the keywords of all
+    categories compiled into one automaton. The text of a transaction is
+    searched once for every keyword, after which the hits are checked in the
+    order categorize would check them.
+    """
+
+    def __init__(
+        self, categories: List[Category], memo_size: int = 4096, normalize: bool = False
+    ):
+        """
+        :param categories: The categories of one kind, as returned by get_categories.
+        :param memo_size: The number of (text, amount) results categorize_many
+        remembers across calls.
+        :param normalize: Match keywords against the merchant key of transactions
+        rather than their full text. Card numbers, dates and reference numbers
+        then no longer make purchases at the same merchant look different, but
+        keywords matching those parts, like 'nok', no longer match.
+        """
+        self.categories = categories
+        self.memo_size = memo_size
+        self.normalize = normalize
+        self._memo = OrderedDict()
+        # Used for the * keyword. The last category with it is the fallback.
+        self.fallback = None
+
+        patterns = {}
+        # By pattern: (priority, category, whether the amount must match)
+        self._candidates: List[List[Tuple[int, Category, bool]]] = []
+
+        def add(pattern: str, priority: int, category: Category, uncertain: bool):
+            if pattern not in patterns:
+                patterns[pattern] = len(patterns)
+                self._candidates.append([])
+            self._candidates[patterns[pattern]].append((priority, category, uncertain))
+
+        priority = 0
+        for category in categories:
+            for keyword in category.keywords:
+                # An empty keyword would match every transaction
+                if not keyword:
+                    continue
+                if keyword[-1] == "?":
+                    add(keyword[:-1], priority, category, True)
+                    priority += 1
+                add(keyword, priority, category, False)
+                priority += 1
+                if keyword == "*":
+                    self.fallback = category.name
+
+        self._automaton = AhoCorasick(patterns)
+
+    def categorize(self, transaction: Transaction) -> Optional[str]:
+        category, _ = self._categorize(transaction, self._text(transaction))
+        return category
+
+    def categorize_many(
+        self, transactions: Iterable[Transaction]
+    ) -> List[Optional[str]]:
+        """
+        Categorize a sequence of transactions. Transactions with identical text,
+        or merchant key if normalizing, share a result, which is computed once
+        and remembered in a bounded least recently used memo. Results depending
+        on the amount through a '?' keyword are shared by identical amounts only.
+        :param transactions: The transactions to categorize.
+        :return: The category names, in the order of transactions.
+        """
+        memo = self._memo
+        result = []
+        for transaction in transactions:
+            text = self._text(transaction)
+            key = text if text in memo else (text, transaction.amount)
+            if key in memo:
+                memo.move_to_end(key)
+                category = memo[key]
+            else:
+                category, depends_on_amount = self._categorize(transaction, text)
+                memo[key if depends_on_amount else text] = category
+                if len(memo) > self.memo_size:
+                    memo.popitem(last=False)
+            result.append(category)
+        return result
+
+    def _categorize(
+        self, transaction: Transaction, text: str
+    ) -> Tuple[Optional[str], bool]:
+        """
+        :return: The category name, and whether it depends on the amount.
+        """
+        hits = sorted(
+            (
+                candidate
+                for pattern in self._automaton.find(text)
+                for candidate in self._candidates[pattern]
+            ),
+            key=lambda candidate: candidate[0],
+        )
+        depends_on_amount = False
+        for _, category, uncertain in hits:
+            if not uncertain:
+                return category.name, depends_on_amount
+            depends_on_amount = True
+            if _categorize_uncertainty(transaction, category):
+                return category.name, depends_on_amount
+        return self.fallback, depends_on_amount
+
+    def _text(self, transaction: Transaction) -> str:
+        return transaction.merchant if self.normalize else transaction.text.lower()
@@ -0,0 +1,96 @@
+from dataclasses import asdict
+from typing import Dict, List, Optional
+
+from .._state import cache_path, locked, read_json, write_json
+from ..gsheets import AnchorLocator, GSheet
+from ._categorize import Category, get_categories
+
+
+class CategoryCache(object):
+    """
+    On-disk cache of the categories parsed from a spreadsheet, keyed by
+    spreadsheet id and valid for one revision of the spreadsheet.
+
+    The revision changes with any edit to the spreadsheet, including the
+    transactions appended by sbankensheets itself. After such writes, renew
+    carries the cached categories over to the new revision.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: Path to the cache file. Defaults to categories.json in the
+        sbankensheets cache directory.
+        """
+        self.path = path if path else cache_path("categories.json")
+
+    def get(
+        self, spreadsheet_id: str, revision: str
+    ) -> Optional[Dict[str, List[Category]]]:
+        """
+        :return: The cached categories by kind, or None if the spreadsheet has
+        no categories cached for revision.
+        """
+        with locked(self.path):
+            entry = read_json(self.path, {}).get(spreadsheet_id)
+
+        if entry is None or entry["revision"] != revision:
+            return None
+
+        return {
+            kind: [Category(**category) for category in categories]
+            for kind, categories in entry["categories"].items()
+        }
+
+    def put(
+        self,
+        spreadsheet_id: str,
+        revision: str,
+        categories: Dict[str, List[Category]],
+    ):
+        with locked(self.path):
+            entries = read_json(self.path, {})
+            entries[spreadsheet_id] = {
+                "revision": revision,
+                "categories": {
+                    kind: [asdict(category) for category in kind_categories]
+                    for kind, kind_categories in categories.items()
+                },
+            }
+            write_json(self.path, entries)
+
+    def renew(self, spreadsheet_id: str, revision: str, new_revision: str) -> bool:
+        """
+        Mark the categories cached for revision as valid for new_revision too.
+        Only call this when the edits in between are known not to touch the
+        categories.
+        :return: Whether categories were cached for revision.
+        """
+        with locked(self.path):
+            entries = read_json(self.path, {})
+            entry = entries.get(spreadsheet_id)
+            if entry is None or entry["revision"] != revision:
+                return False
+
+            entry["revision"] = new_revision
+            write_json(self.path, entries)
+            return True
+
+    def fetch(
+        self, gsheet: GSheet, revision: str = None, locator: AnchorLocator = None
+    ) -> Optional[Dict[str, List[Category]]]:
+        """
+        Get the categories of a spreadsheet, from the cache if the spreadsheet
+        is unchanged since they were cached, else with get_categories.
+        :param gsheet: The spreadsheet.
+        :param revision: The current revision of the spreadsheet, if known.
+        :param locator: Locator for the category headers, passed on to
+        get_categories.
+        :return: The categories by kind, or None if get_categories fails.
+        """
+        revision = revision if revision else gsheet.revision()
+        categories = self.get(gsheet.spreadsheet_id, revision)
+        if categories is None:
+            categories = get_categories(gsheet, locator)
+            if categories is not None:
+                self.put(gsheet.spreadsheet_id, revision, categories)
+        return categories
@@ -1,3 +1,5 @@
 from ._helpers import *
 from .a1 import *
 from .google_sheets import *
+from .column_cache import *
+from .anchor_locator import *
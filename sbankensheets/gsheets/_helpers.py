@@ -4,16 +4,21 @@ from ..gsheets.a1 import A1Cell, A1Range
 from ..gsheets.google_sheets import GSheet
 
 
-def find_cells(gsheet: GSheet, sheet: str, value: str) -> Optional[List[A1Cell]]:
+def find_cells(
+    gsheet: GSheet, sheet: str, value: str, value_render_option: str = None
+) -> Optional[List[A1Cell]]:
     """
     Find cells with value in a GSheet.
 
     :param gsheet: The GSheet spreadsheet to find the cells
     :param sheet: The sheet within the GSheet spreadsheet
     :param value: The cell value to be found
+    :param value_render_option: Rendering option for the values searched. With
+    use_snapshots, using the same as later reads of the sheet lets one snapshot
+    answer both.
     :return: If value is found, a list of A1Cells, else None
     """
-    response = gsheet.get(A1Range(sheet=sheet))
+    response = gsheet.get(A1Range(sheet=sheet), value_render_option=value_render_option)
 
     values = response.get("values", [])
 
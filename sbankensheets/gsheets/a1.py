@@ -1,4 +1,4 @@
-from typing import Union, Tuple, Sequence
+from typing import Optional, Union, Tuple, Sequence
 
 
 class A1Cell(object):
@@ -187,6 +187,26 @@ class A1Range(object):
                 x == y for x, y in zip(self._range, other._range)
             )
 
+    def bounds(self) -> Optional[Tuple[int, int, int, Optional[int]]]:
+        """
+        The zero-based indices of the range, as (start column, start row, end
+        column, end row), all inclusive. The end row is None if the range
+        covers the remaining rows.
+        :return: The indices, or None if the range covers an entire sheet.
+        """
+        start_cell, end_cell = self._range
+        if not start_cell:
+            return None
+
+        start_col, start_row = cell_to_idx(str(start_cell))
+        if isinstance(end_cell, A1Cell):
+            end_col, end_row = cell_to_idx(str(end_cell))
+            return start_col, start_row, end_col, end_row
+
+        # A column, like in C3:E, or no end cell, like in C3:C
+        end_col = col_to_index(end_cell) if end_cell else start_col
+        return start_col, start_row, end_col, None
+
     def __getitem__(self, key: int) -> A1Cell:
         if 0 > key > 1:
             raise IndexError(f"Expected 0 or 1: {key}")
@@ -0,0 +1,89 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ..gsheets._helpers import find_cells
+from ..gsheets.a1 import A1Cell, A1Range
+from ..gsheets.google_sheets import GSheet
+
+
+class AnchorLocator(object):
+    """
+    Finds header cells like find_cells, but through named ranges in the
+    spreadsheet instead of scanning a downloaded sheet.
+
+    The first time a header is looked for, it is found with find_cells, and
+    each cell found is given a named range, which follows the cell when rows
+    or columns are inserted. Later lookups read the named ranges and the
+    header cells only. If a named cell no longer holds the header, the sheet
+    is scanned again and the named ranges are replaced.
+    """
+
+    prefix = "sbankensheets"
+
+    def __init__(self, gsheet: GSheet):
+        self.gsheet = gsheet
+        self._named_ranges: Optional[Dict[str, A1Range]] = None
+
+    def find_cells(
+        self, sheet: str, value: str, value_render_option: str = None
+    ) -> Optional[List[A1Cell]]:
+        """
+        Find the cells with value in the first row of sheet it is in.
+
+        :param sheet: The sheet within the spreadsheet
+        :param value: The cell value to be found
+        :param value_render_option: Rendering option for the values searched.
+        :return: If value is found, a list of A1Cells, else None
+        """
+        name = self._name(sheet, value)
+        ranges = self._ranges(name)
+        if ranges and self._hold(ranges, value, value_render_option):
+            return [A1Cell(*range.bounds()[:2]) for range in ranges]
+
+        cells = find_cells(self.gsheet, sheet, value, value_render_option)
+        if cells:
+            self._register(name, sheet, cells)
+        return cells
+
+    @classmethod
+    def _name(cls, sheet: str, value: str) -> str:
+        # Named ranges may only contain letters, digits and underscores
+        return "_".join(
+            re.sub(r"[^A-Za-z0-9]+", "_", part) for part in (cls.prefix, sheet, value)
+        )
+
+    def _ranges(self, name: str) -> List[A1Range]:
+        """
+        The ranges named name_0, name_1, ..., in order.
+        """
+        if self._named_ranges is None:
+            self._named_ranges = self.gsheet.named_ranges()
+
+        numbered: List[Tuple[int, A1Range]] = []
+        for range_name, range in self._named_ranges.items():
+            head, _, number = range_name.rpartition("_")
+            if head == name and number.isdigit():
+                numbered.append((int(number), range))
+        return [range for _, range in sorted(numbered, key=lambda x: x[0])]
+
+    def _hold(self, ranges: List[A1Range], value: str, value_render_option) -> bool:
+        response = self.gsheet.get_batch(
+            ranges, value_render_option=value_render_option
+        )
+        value_ranges = response.get("valueRanges", [])
+        return len(value_ranges) == len(ranges) and all(
+            value_range.get("values") == [[value]] for value_range in value_ranges
+        )
+
+    def _register(self, name: str, sheet: str, cells: List[A1Cell]):
+        ranges = {
+            f"{name}_{i}": A1Range(cell, cell, sheet=sheet)
+            for i, cell in enumerate(cells)
+        }
+        # Left over from when the header was in more cells
+        stale = [f"{name}_{i}" for i in range(len(cells), len(self._ranges(name)))]
+        self.gsheet.set_named_ranges(ranges, remove=stale)
+
+        self._named_ranges.update(ranges)
+        for range_name in stale:
+            self._named_ranges.pop(range_name, None)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+from typing import List
+
+from .._state import cache_path, locked, read_json, write_json
+from ..gsheets.a1 import A1Cell, A1Range, idx_to_col
+from ..gsheets.google_sheets import GSheet
+
+
+class ColumnCache(object):
+    """
+    On-disk copy of sheet ranges that only grow at the bottom, like the
+    transaction id columns, so each run only reads the rows added since the
+    last one.
+
+    Along with the values, the number of rows and a checksum of the last rows
+    are kept. Reads start a few rows before the known end. If those rows no
+    longer match the checksum, the range was edited above its end, and it is
+    read in full instead.
+    """
+
+    def __init__(self, path: str = None, overlap: int = 3):
+        """
+        :param path: Path to the cache file. Defaults to columns.json in the
+        sbankensheets cache directory.
+        :param overlap: Number of known rows read again to detect edits.
+        """
+        self.path = path if path else cache_path("columns.json")
+        self.overlap = max(1, overlap)
+
+    def get(self, gsheet: GSheet, range: A1Range) -> List[List]:
+        """
+        Get the values of a range covering the remaining rows, like
+        gsheet.get(range)["values"].
+        :param gsheet: The spreadsheet.
+        :param range: The range, with a start cell and no end row.
+        :return: The values of the range.
+        """
+        start_col, start_row, end_col, end_row = range.bounds()
+        if end_row is not None:
+            raise ValueError(f"Expected a range covering the remaining rows: {range}")
+
+        key = f"{gsheet.spreadsheet_id}/{range}"
+        with locked(self.path):
+            entry = read_json(self.path, {}).get(key)
+
+        values = None
+        if entry is not None:
+            known = entry["values"]
+            tail_start = max(0, entry["rows"] - self.overlap)
+            tail_range = A1Range(
+                A1Cell(start_col, start_row + tail_start),
+                idx_to_col(end_col),
+                sheet=range.sheet,
+            )
+            tail = gsheet.get(tail_range).get("values", [])
+
+            overlap = tail[: entry["rows"] - tail_start]
+            if (
+                len(overlap) == entry["rows"] - tail_start
+                and self._checksum(overlap) == entry["checksum"]
+            ):
+                values = known[:tail_start] + tail
+
+        if values is None:
+            values = gsheet.get(range).get("values", [])
+
+        with locked(self.path):
+            entries = read_json(self.path, {})
+            entries[key] = {
+                "rows": len(values),
+                "checksum": self._checksum(
+                    values[max(0, len(values) - self.overlap) :]
+                ),
+                "values": values,
+            }
+            write_json(self.path, entries)
+
+        return values
+
+    @staticmethod
+    def _checksum(values: List[List]) -> str:
+        canonical = json.dumps(values, separators=(",", ":"), ensure_ascii=False)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
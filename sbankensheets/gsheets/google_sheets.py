@@ -1,10 +1,11 @@
-from typing import Dict, Sequence
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from httplib2 import Http
 from oauth2client import file, client, tools
 
-from ..gsheets.a1 import A1Range
+from ..gsheets.a1 import A1Cell, A1Range, idx_to_col
 
 
 class GSheet(object):
@@ -12,20 +13,57 @@ class GSheet(object):
     Class for handling request to Google Sheets.
     """
 
+    scopes = (
+        "https://www.googleapis.com/auth/spreadsheets",
+        # Used to read the revision of the spreadsheet
+        "https://www.googleapis.com/auth/drive.metadata.readonly",
+    )
+
     @staticmethod
-    def _create_authenticated_google_service():
-        scope = "https://www.googleapis.com/auth/spreadsheets"
+    def _create_authenticated_google_service(name: str = "sheets", version: str = "v4"):
         store = file.Storage("auth/token.json")
         creds = store.get()
-        if not creds or creds.invalid:
-            flow = client.flow_from_clientsecrets("auth/credentials.json", scope)
+        if not creds or creds.invalid or not creds.has_scopes(GSheet.scopes):
+            flow = client.flow_from_clientsecrets(
+                "auth/credentials.json", GSheet.scopes
+            )
             creds = tools.run_flow(flow, store)
-        service = build("sheets", "v4", http=creds.authorize(Http()))
+        service = build(name, version, http=creds.authorize(Http()))
         return service
 
-    def __init__(self, spreadsheet_id: str):
+    def __init__(self, spreadsheet_id: str, use_snapshots: bool = False):
+        """
+        :param spreadsheet_id: The id of the spreadsheet.
+        :param use_snapshots: Read each sheet at most once, and answer reads of
+        ranges within it from that snapshot until the sheet is invalidated.
+        Writes through this object invalidate the sheets they write to.
+        """
         self.service = GSheet._create_authenticated_google_service()
         self.spreadsheet_id = spreadsheet_id
+        self.use_snapshots = use_snapshots
+        self._drive_service = None
+        # By (sheet, value render option, date time render option)
+        self._snapshots: Dict[Tuple, List[List]] = {}
+
+    @property
+    def drive_service(self):
+        if self._drive_service is None:
+            self._drive_service = GSheet._create_authenticated_google_service(
+                "drive", "v3"
+            )
+        return self._drive_service
+
+    def revision(self) -> str:
+        """
+        Get the revision of the spreadsheet, which changes whenever any of its
+        sheets is edited.
+        :return: The version number of the spreadsheet in Google Drive.
+        """
+        return (
+            self.drive_service.files()
+            .get(fileId=self.spreadsheet_id, fields="version")
+            .execute()["version"]
+        )
 
     def get(
         self, range: A1Range, value_render_option=None, date_time_render_option=None
@@ -40,6 +78,11 @@ class GSheet(object):
         FORMATTED_STRING
         :return: A dict with the cell values stored in 'values'.
         """
+        if self._snapshot_covers(range):
+            return self._get_from_snapshot(
+                range, value_render_option, date_time_render_option
+            )
+
         return (
             self.service.spreadsheets()
             .values()
@@ -70,6 +113,7 @@ class GSheet(object):
         new rows for each entry.
         :return: A confirmation dict.
         """
+        self.invalidate(self._sheet_of(range))
         return (
             self.service.spreadsheets()
             .values()
@@ -83,20 +127,294 @@ class GSheet(object):
             .execute()
         )
 
-    def get_batch(self, ranges) -> Dict:
+    def batch_update(
+        self,
+        data: Sequence[Tuple[A1Range, Sequence[Sequence[str]]]],
+        value_input_option: str = "USER_ENTERED",
+    ) -> Dict:
+        """
+        Write values to several ranges, possibly in different sheets, in one
+        request. Unlike append, this does not add rows to the sheet, so if a
+        range ends below the last row of its sheet, rows are appended and the
+        write is retried.
+        :param data: Pairs of the range to write and the values to write to it.
+        :param value_input_option: 'USER_ENTERED' or 'RAW', whether the input should be as if the user
+        entered the values or not.
+        :return: A confirmation dict, with a confirmation per range in 'responses',
+        in the order of data.
+        """
+        for range, _ in data:
+            self.invalidate(self._sheet_of(range))
+
+        request = (
+            self.service.spreadsheets()
+            .values()
+            .batchUpdate(
+                spreadsheetId=self.spreadsheet_id,
+                body={
+                    "valueInputOption": value_input_option,
+                    "data": [
+                        {"range": str(range), "values": values}
+                        for range, values in data
+                    ],
+                },
+            )
+        )
+        try:
+            return request.execute()
+        except HttpError as error:
+            if error.resp.status != 400 or b"exceeds grid limits" not in error.content:
+                raise
+
+        self._fit_rows([range for range, _ in data])
+        return request.execute()
+
+    def get_batch(
+        self, ranges, value_render_option=None, date_time_render_option=None
+    ) -> Dict:
         """
         Get a batch of cell values within the specified ranges.
         :param ranges: The ranges to retrieve the cell values from.
-        :return: A list of dicts with the cell values stored in 'values'.
+        :param value_render_option: Rendering option for output value.
+        Valid valued are FORMATTED_VALUE, UNFORMATTED_VALUE and FORMULA
+        :param date_time_render_option: Determines how dates should be
+        rendered in the output. Valid values are SERIAL_NUMBER and
+        FORMATTED_STRING
+        :return: A dict with a list of dicts with the cell values stored in
+        'values' in 'valueRanges', in the order of ranges.
         """
+        if all(self._snapshot_covers(r) for r in ranges):
+            return {
+                "spreadsheetId": self.spreadsheet_id,
+                "valueRanges": [
+                    self._get_from_snapshot(
+                        r, value_render_option, date_time_render_option
+                    )
+                    for r in ranges
+                ],
+            }
+
         return (
             self.service.spreadsheets()
             .values()
             .batchGet(
-                spreadsheetId=self.spreadsheet_id, ranges=[str(r) for r in ranges]
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[str(r) for r in ranges],
+                valueRenderOption=value_render_option,
+                dateTimeRenderOption=date_time_render_option,
             )
             .execute()
         )
 
+    def named_ranges(self) -> Dict[str, A1Range]:
+        """
+        Get the named ranges of the spreadsheet, without reading any cells.
+        :return: The ranges by name.
+        """
+        response = self._get_named_ranges()
+        titles = {
+            sheet["properties"].get("sheetId", 0): sheet["properties"]["title"]
+            for sheet in response.get("sheets", [])
+        }
+        return {
+            named_range["name"]: _a1_range(named_range["range"], titles)
+            for named_range in response.get("namedRanges", [])
+        }
+
+    def set_named_ranges(
+        self, ranges: Dict[str, A1Range], remove: Sequence[str] = ()
+    ) -> Dict:
+        """
+        Name ranges in the spreadsheet, replacing named ranges with the same
+        names. The ranges follow their cells when rows or columns are
+        inserted or moved.
+        :param ranges: The ranges by name. Every range must have a sheet.
+        :param remove: Names of named ranges to remove.
+        :return: A confirmation dict.
+        """
+        response = self._get_named_ranges()
+        sheet_ids = {
+            sheet["properties"]["title"]: sheet["properties"].get("sheetId", 0)
+            for sheet in response.get("sheets", [])
+        }
+        requests = [
+            {"deleteNamedRange": {"namedRangeId": named_range["namedRangeId"]}}
+            for named_range in response.get("namedRanges", [])
+            if named_range["name"] in ranges or named_range["name"] in remove
+        ]
+        requests += [
+            {
+                "addNamedRange": {
+                    "namedRange": {
+                        "name": name,
+                        "range": _grid_range(range, sheet_ids[range.sheet]),
+                    }
+                }
+            }
+            for name, range in ranges.items()
+        ]
+        return (
+            self.service.spreadsheets()
+            .batchUpdate(spreadsheetId=self.spreadsheet_id, body={"requests": requests})
+            .execute()
+        )
+
+    def invalidate(self, sheet: str = None):
+        """
+        Drop the snapshot of a sheet, so it is read again on next use. Must be
+        called after the sheet is edited other than through this object.
+        :param sheet: The sheet to invalidate. Defaults to every sheet.
+        """
+        for key in list(self._snapshots):
+            if sheet is None or key[0] == sheet:
+                del self._snapshots[key]
+
     def clear(self):
         raise NotImplementedError
+
+    def _snapshot_covers(self, range) -> bool:
+        return self.use_snapshots and self._sheet_of(range) is not None
+
+    @staticmethod
+    def _sheet_of(range) -> Optional[str]:
+        return range.sheet if isinstance(range, A1Range) else None
+
+    def _fit_rows(self, ranges: Sequence[A1Range]):
+        """
+        Append rows to the sheets of ranges ending below their last row.
+        """
+        end_rows: Dict[str, int] = {}
+        for range in ranges:
+            sheet = self._sheet_of(range)
+            bounds = range.bounds() if sheet is not None else None
+            if bounds is not None and bounds[3] is not None:
+                end_rows[sheet] = max(end_rows.get(sheet, 0), bounds[3] + 1)
+        if not end_rows:
+            return
+
+        response = (
+            self.service.spreadsheets()
+            .get(
+                spreadsheetId=self.spreadsheet_id,
+                fields="sheets.properties(sheetId,title,gridProperties.rowCount)",
+            )
+            .execute()
+        )
+        requests = []
+        for sheet in response.get("sheets", []):
+            properties = sheet["properties"]
+            end_row = end_rows.get(properties["title"], 0)
+            row_count = properties.get("gridProperties", {}).get("rowCount", 0)
+            if end_row > row_count:
+                requests.append(
+                    {
+                        "appendDimension": {
+                            "sheetId": properties.get("sheetId", 0),
+                            "dimension": "ROWS",
+                            "length": end_row - row_count,
+                        }
+                    }
+                )
+
+        if requests:
+            self.service.spreadsheets().batchUpdate(
+                spreadsheetId=self.spreadsheet_id, body={"requests": requests}
+            ).execute()
+
+    def _get_named_ranges(self) -> Dict:
+        return (
+            self.service.spreadsheets()
+            .get(
+                spreadsheetId=self.spreadsheet_id,
+                fields="namedRanges,sheets.properties(sheetId,title)",
+            )
+            .execute()
+        )
+
+    def _get_from_snapshot(
+        self, range: A1Range, value_render_option, date_time_render_option
+    ) -> Dict:
+        key = (range.sheet, value_render_option, date_time_render_option)
+        if key not in self._snapshots:
+            response = (
+                self.service.spreadsheets()
+                .values()
+                .get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=str(A1Range(sheet=range.sheet)),
+                    valueRenderOption=value_render_option,
+                    dateTimeRenderOption=date_time_render_option,
+                )
+                .execute()
+            )
+            self._snapshots[key] = response.get("values", [])
+
+        response = {"range": str(range), "majorDimension": "ROWS"}
+        values = _slice_values(self._snapshots[key], range.bounds())
+        # Like the api, leave out values if the range is empty
+        if values:
+            response["values"] = values
+        return response
+
+
+def _slice_values(values: List[List], bounds) -> List[List]:
+    """
+    Cut the values of a range out of the values of a sheet, trimming trailing
+    empty cells and rows like the api does.
+    """
+    if bounds is None:
+        return values
+
+    start_col, start_row, end_col, end_row = bounds
+    rows = values[start_row : None if end_row is None else end_row + 1]
+
+    result = []
+    for row in rows:
+        row = row[start_col : end_col + 1]
+        end = len(row)
+        while end and row[end - 1] == "":
+            end -= 1
+        result.append(row[:end])
+
+    while result and not result[-1]:
+        result.pop()
+    return result
+
+
+def _grid_range(range: A1Range, sheet_id: int) -> Dict:
+    """
+    Convert a range to the zero based, end exclusive GridRange of the api.
+    Bounds left out are unbounded.
+    """
+    grid_range = {"sheetId": sheet_id}
+    bounds = range.bounds()
+    if bounds is None:
+        return grid_range
+
+    start_col, start_row, end_col, end_row = bounds
+    grid_range.update(
+        startColumnIndex=start_col, endColumnIndex=end_col + 1, startRowIndex=start_row
+    )
+    if end_row is not None:
+        grid_range["endRowIndex"] = end_row + 1
+    return grid_range
+
+
+def _a1_range(grid_range: Dict, titles: Dict[int, str]) -> A1Range:
+    """
+    Convert a GridRange of the api to a range. The api leaves out zero indices.
+    """
+    sheet = titles[grid_range.get("sheetId", 0)]
+    if "endColumnIndex" not in grid_range:
+        return A1Range(sheet=sheet)
+
+    start_cell = A1Cell(
+        grid_range.get("startColumnIndex", 0), grid_range.get("startRowIndex", 0)
+    )
+    if "endRowIndex" in grid_range:
+        end_cell = A1Cell(
+            grid_range["endColumnIndex"] - 1, grid_range["endRowIndex"] - 1
+        )
+    else:
+        end_cell = idx_to_col(grid_range["endColumnIndex"] - 1)
+    return A1Range(start_cell, end_cell, sheet=sheet)
@@ -1,6 +1,7 @@
 import sbankensheets.categorize as ct
 import sbankensheets.gsheets as gs
 import sbankensheets.sbanken as sb
+import sbankensheets.store as st
 from sbankensheets.gsheets import urls
 
 
@@ -9,80 +10,119 @@ def main():
 
     load_dotenv(find_dotenv())
 
-    sbanken = sb.SbankenSession()
+    sbanken = sb.SbankenSession(
+        token_cache=sb.TokenCache(), scheduler=sb.RequestScheduler()
+    )
 
     account = sbanken.get_account("Brukskonto")
-
-    transactions = sbanken.get_transactions(
-        account["accountId"], start_date="2018-08-12", length=1000
-    )
+    account_id = account["accountId"]
+
+    # Only fetch what was booked since the last run
+    watermarks = sb.WatermarkStore()
+    start_date = watermarks.start_date(account_id)
+    if start_date is None:
+        fetched_transactions = sbanken.backfill_transactions(account_id, "2018-08-12")
+    else:
+        fetched_transactions = sbanken.get_all_transactions(
+            account_id, start_date=start_date
+        )
+    transactions = watermarks.filter_new(account_id, fetched_transactions)
 
     gsheet = gs.GSheet(urls.spreadsheet_id)
 
-    categories = ct.get_categories(gsheet)
+    # Headers are found through named ranges, so sheets are not read in full
+    locator = gs.AnchorLocator(gsheet)
+
+    # Categories are only read again when the spreadsheet has changed
+    category_cache = ct.CategoryCache()
+    revision = gsheet.revision()
+    categories = category_cache.fetch(gsheet, revision, locator)
 
     sheet = "August Transaksjoner"
 
-    divided_transactions = sb.divide_transactions(
-        transactions,
+    divided_transactions = sb.TransactionBatch(transactions).divide(
         (
-            ("expenses", lambda x: x.amount < 0 and x.transaction_type_code != 200),
-            ("income", lambda x: x.amount > 0 and x.transaction_type_code != 200),
-            ("savings", lambda x: x.amount < 0 and x.transaction_type_code == 200),
-        ),
+            ("expenses", sb.Rule(sign=-1, exclude_type_codes=(200,))),
+            ("income", sb.Rule(sign=1, exclude_type_codes=(200,))),
+            ("savings", sb.Rule(sign=-1, type_codes=(200,))),
+        )
     )
 
+    # Only the rows added to the sections since the last run are read
+    section_columns = gs.ColumnCache()
+
     # Start cells
-    expenses_date_cell, income_date_cell, savings_date_cell = gs.find_cells(
-        gsheet, sheet, "Dato"
+    expenses_date_cell, income_date_cell, savings_date_cell = locator.find_cells(
+        sheet, "Dato"
     )
 
+    # Written in one request once every section is prepared
+    updates = []
+
     for transaction_date_cell, name in zip(
         (expenses_date_cell, income_date_cell, savings_date_cell),
         ("expenses", "income", "savings"),
     ):
-        for transaction in divided_transactions[name]:
-            category = ct.categorize(transaction, categories[name])
-            transaction.category = category
-
         # Subtract a column for encoding
         transaction_id_cell = transaction_date_cell - (1, 0)
 
-        # Extract encoding
+        # Every column of the section, as rows may have data but no id
         # + (0, 1) for dropping header
-        transaction_id_range = gs.A1Range.from_cell(
-            transaction_id_cell + (0, 1), sheet=sheet
+        section_range = gs.A1Range(
+            transaction_id_cell + (0, 1),
+            (transaction_id_cell + (4, 0))[0],
+            sheet=sheet,
         )
-
-        transaction_ids = gsheet.get(transaction_id_range)
-        transaction_id_values = transaction_ids["values"]
+        section_values = section_columns.get(gsheet, section_range)
+        transaction_id_values = [row for row in section_values if row and row[0]]
 
         # If transactions are manually entered, they're id should me '.'
         gs_automatic_cell_values = gs.filter_manual_cell_values(transaction_id_values)
-        gs_transactions = sb.cell_values_to_transactions(gs_automatic_cell_values)
+        gs_transaction_ids = sb.cell_values_to_ids(gs_automatic_cell_values)
 
         sb_transactions = divided_transactions[name]
-        filtered_transactions = sb.filter_transactions(sb_transactions, gs_transactions)
+        filtered_transactions = sb.filter_transactions(
+            sb_transactions, gs_transaction_ids
+        )
 
+        # Only categorize and format the transactions that will be written
+        categorizer = ct.Categorizer(categories[name])
+        for transaction, category in zip(
+            filtered_transactions, categorizer.categorize_many(filtered_transactions)
+        ):
+            transaction.category = category
+
+        # Reverse order to ascending
+        values = [t.to_sheets_row(encode=True) for t in reversed(filtered_transactions)]
+        if not values:
+            print(f"No updates for {name}")
+            continue
+
+        start_cell = transaction_id_cell + (0, 1 + len(section_values))
         transaction_range = gs.A1Range.from_cell(
-            transaction_id_cell, range=(4, 0), sheet=sheet
+            start_cell, range=(4, len(values) - 1), sheet=sheet
         )
+        updates.append((name, transaction_range, values))
 
-        # Append transactions
-        values = list(
-            map(lambda t: t.to_sheets_row(encode=True), filtered_transactions)
+    if updates:
+        response = gsheet.batch_update(
+            [(transaction_range, values) for _, transaction_range, values in updates]
         )
-        # Reverse order to ascending
-        values = values[::-1]
-        response = gsheet.append(transaction_range, values)
-
-        if "updatedRows" in response["updates"]:
-            updates = response["updates"]
+        for (name, _, _), result in zip(updates, response["responses"]):
             print(
-                f"Updated {updates['updatedRows']} rows and {updates['updatedColumns']} columns for {name}"
+                f"Updated {result['updatedRows']} rows and {result['updatedColumns']} columns for {name}"
             )
-        else:
-            print(f"No updates for {name}")
+
+        # Writing changed the revision, but not the categories. Only the
+        # sections and named ranges were written since revision was read, a
+        # few seconds ago, so it serves as the revision before the writes.
+        category_cache.renew(gsheet.spreadsheet_id, revision, gsheet.revision())
+
+    # Every fetched transaction, so identical ones are numbered like last run
+    with st.TransactionStore() as store:
+        store.upsert(account_id, fetched_transactions)
+
+    watermarks.advance(account_id, fetched_transactions)
 
 
 if __name__ == "__main__":
@@ -1,2 +1,7 @@
+from .async_sbanken_session import *
 from .sbanken_session import *
+from .scheduler import *
+from .token_cache import *
 from .transaction import *
+from .transaction_batch import *
+from .watermark import *
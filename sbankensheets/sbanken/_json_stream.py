@@ -0,0 +1,129 @@
+import codecs
+import json
+import re
+from typing import Any, Dict, Iterable, Iterator, Union
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+_delimiters = frozenset(" \t\n\r,:]}")
+
+
+class _Buffer(object):
+    """
+    Text buffer over an iterable of chunks, holding only the unparsed tail.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """
+        Append the next chunk, dropping the parsed text.
+        :return: False if the chunks were already exhausted, else True.
+        """
+        if self.eof:
+            return False
+
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            chunk = self._decoder.decode(b"", final=True)
+            self.eof = True
+
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        self.text = self.text[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self) -> str:
+        while True:
+            self.pos = _whitespace.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                break
+            if not self.fill():
+                raise ValueError("Unexpected end of json document")
+
+        char = self.text[self.pos]
+        self.pos += 1
+        return char
+
+    def peek_char(self) -> str:
+        char = self.next_char()
+        self.pos -= 1
+        return char
+
+    def expect(self, expected: str):
+        char = self.next_char()
+        if char != expected:
+            raise ValueError(f"Expected '{expected}' in json document: '{char}'")
+
+    def value(self) -> Any:
+        self.peek_char()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            # A number may continue in the next chunk, also when split after
+            # a '.', 'e' or '-', which the decoder stops before
+            if (
+                end == len(self.text) or self.text[end] not in _delimiters
+            ) and self.fill():
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_array(
+    chunks: Iterable[Union[bytes, str]], key: str, fields: Dict
+) -> Iterator[Any]:
+    """
+    Incrementally parse a json object, yielding the elements of one of its array
+    members one by one.
+
+    The remaining members of the object are stored in fields as soon as they
+    are parsed, so members preceding the array are available while iterating.
+    :param chunks: The json document, in utf-8 encoded or decoded chunks.
+    :param key: The key of the array to stream.
+    :param fields: Dict receiving the other members of the object.
+    :return: An iterator over the elements of the array.
+    """
+    buffer = _Buffer(chunks)
+
+    buffer.expect("{")
+    if buffer.peek_char() == "}":
+        return
+
+    while True:
+        name = buffer.value()
+        buffer.expect(":")
+
+        if name == key and buffer.peek_char() == "[":
+            buffer.expect("[")
+            if buffer.peek_char() == "]":
+                buffer.expect("]")
+            else:
+                while True:
+                    yield buffer.value()
+                    char = buffer.next_char()
+                    if char == "]":
+                        break
+                    if char != ",":
+                        raise ValueError(f"Expected ',' or ']' in json array: '{char}'")
+        else:
+            fields[name] = buffer.value()
+
+        char = buffer.next_char()
+        if char == "}":
+            return
+        if char != ",":
+            raise ValueError(f"Expected ',' or '}}' in json object: '{char}'")
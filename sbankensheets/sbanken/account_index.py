@@ -0,0 +1,63 @@
+import time
+from typing import Dict, Iterable, Optional, Sequence
+
+
+class AccountIndex(object):
+    """
+    In-memory index of accounts, keyed by (name, owner customer id) and by
+    account id, which expires after a configurable time to live.
+    """
+
+    def __init__(self, ttl: float = 300):
+        """
+        :param ttl: Seconds the accounts are considered fresh after an update.
+        """
+        self.ttl = ttl
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Mark the index as stale, so the accounts are fetched again on next use.
+        """
+        self._accounts = []
+        self._by_name = None
+        self._by_id = None
+        self._updated_at = None
+
+    def is_stale(self) -> bool:
+        return (
+            self._updated_at is None or time.monotonic() - self._updated_at >= self.ttl
+        )
+
+    def update(self, accounts: Iterable[Dict]):
+        """
+        Replace the indexed accounts.
+        :param accounts: Accounts as returned by the Sbanken API.
+        """
+        self._accounts = list(accounts)
+        self._by_name = None
+        self._by_id = None
+        self._updated_at = time.monotonic()
+
+    @property
+    def accounts(self) -> Sequence[Dict]:
+        return self._accounts
+
+    def by_name(self, account_name: str, customer_id: str) -> Optional[Dict]:
+        if self._by_name is None:
+            self._by_name = self._build_index(
+                lambda account: (account["name"], account["ownerCustomerId"])
+            )
+        return self._by_name.get((account_name, customer_id))
+
+    def by_id(self, account_id: str) -> Optional[Dict]:
+        if self._by_id is None:
+            self._by_id = self._build_index(lambda account: account["accountId"])
+        return self._by_id.get(account_id)
+
+    def _build_index(self, key) -> Dict:
+        index = {}
+        for account in self._accounts:
+            # Keep the first match, as a linear scan would
+            index.setdefault(key(account), account)
+        return index
@@ -0,0 +1,346 @@
+import asyncio
+import urllib.parse
+from os import environ
+from typing import List, Dict, Optional, Sequence
+
+import aiohttp
+
+from ..sbanken.account_index import AccountIndex
+from ..sbanken.errors import SbankenError
+from ..sbanken.sbanken_session import BaseSbankenSession
+from ..sbanken.scheduler import RequestScheduler
+from ..sbanken.token_cache import TokenCache
+from ..sbanken.transaction import Transaction
+
+
+class AsyncSbankenSession(BaseSbankenSession):
+    """
+    Class for handling HTTPS requests to the REST API from SBanken concurrently,
+    using asyncio and a pooled aiohttp client.
+
+    The session must be entered before use, which authenticates it:
+
+        >>> async with AsyncSbankenSession() as sbanken:
+        ...     accounts = await sbanken.get_accounts()
+    """
+
+    def __init__(
+        self,
+        customer_id: str = None,
+        connection_limit: int = 10,
+        token_cache: TokenCache = None,
+        account_ttl: float = 300,
+        scheduler: RequestScheduler = None,
+        api_url: str = None,
+        token_url: str = None,
+    ):
+        """
+        :param customer_id: Default customer id for requests. Defaults to the
+        CUSTOMER_ID environment variable.
+        :param connection_limit: The maximum number of simultaneous connections.
+        :param token_cache: Cache to reuse access tokens from. If given, the
+        token is also refreshed in the background shortly before it expires.
+        :param account_ttl: Seconds the accounts are cached before fetched again.
+        :param scheduler: Scheduler pacing and retrying the requests, which may
+        be shared with other sessions.
+        :param api_url: Base url of the bank api. Defaults to Sbanken's.
+        :param token_url: Url of the identity server token endpoint. Defaults to Sbanken's.
+        """
+        if api_url:
+            self.api_url = api_url
+        if token_url:
+            self.token_url = token_url
+        self.client_id = environ["CLIENT_ID"]
+        self.client_secret = environ["CLIENT_SECRET"]
+        self.customer_id = customer_id if customer_id else environ["CUSTOMER_ID"]
+        self.connection_limit = connection_limit
+        self.token_cache = token_cache
+        self.account_ttl = account_ttl
+        self.scheduler = scheduler
+        self.account_indexes = {}
+        self._account_locks = {}
+        self.session = None
+        self._token = None
+        self._refresh_task = None
+
+    async def __aenter__(self) -> "AsyncSbankenSession":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def open(self):
+        """
+        Create the pooled http session and fetch an access token.
+        """
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.connection_limit)
+        )
+        # Sent per request, as aiohttp refuses an Authorization header in the
+        # session headers together with the basic auth of the token request
+        self._token = await self._get_token()
+
+        if self.token_cache is not None:
+            self._refresh_task = asyncio.ensure_future(self._refresh_token(self._token))
+
+    async def close(self):
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            self._refresh_task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def get_transactions(
+        self,
+        account_id: str,
+        index: int = 0,
+        length: int = 100,
+        start_date=None,
+        end_date=None,
+        customer_id: str = None,
+    ) -> List[Transaction]:
+        """
+        Get the transactions from the given account id
+        :param account_id: The account id to retrieve transactions from
+        :param index: The start index of the transactions.
+        :param length: The maximum number of transactions to return
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :param customer_id: The customer to make the request as. Defaults to the
+        customer id of the session.
+        :return: A list of Transaction objects.
+        """
+        response = await self._get_transactions_page(
+            account_id, index, length, start_date, end_date, customer_id
+        )
+
+        return self._to_booked_transactions(response["items"])
+
+    async def get_all_transactions(
+        self,
+        account_id: str,
+        start_date=None,
+        end_date=None,
+        page_size: int = 1000,
+        customer_id: str = None,
+    ) -> List[Transaction]:
+        """
+        Get every transaction from the given account id within the date range,
+        fetching the pages after the first one concurrently.
+        :param account_id: The account id to retrieve transactions from
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :param page_size: The number of transactions to request per page.
+        :param customer_id: The customer to make the request as. Defaults to the
+        customer id of the session.
+        :return: A list of Transaction objects.
+        """
+        if page_size < 1:
+            raise ValueError(f"page_size must be > 0: {page_size}")
+
+        first_page = await self._get_transactions_page(
+            account_id, 0, page_size, start_date, end_date, customer_id
+        )
+        items = list(first_page["items"])
+
+        available_items = first_page.get("availableItems", len(items))
+        pages = await asyncio.gather(
+            *(
+                self._get_transactions_page(
+                    account_id, index, page_size, start_date, end_date, customer_id
+                )
+                for index in range(page_size, available_items, page_size)
+            )
+        )
+        for page in pages:
+            items.extend(page["items"])
+
+        return self._to_booked_transactions(items)
+
+    async def get_transactions_for_accounts(
+        self, accounts: Sequence[Dict], start_date=None, end_date=None
+    ) -> Dict[str, List[Transaction]]:
+        """
+        Get every transaction for each of the given accounts at once. Each
+        account is requested as its owner.
+        :param accounts: Accounts as returned by get_accounts.
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :return: A dict of lists of Transaction objects, keyed by account id.
+        """
+        results = await asyncio.gather(
+            *(
+                self.get_all_transactions(
+                    account["accountId"],
+                    start_date=start_date,
+                    end_date=end_date,
+                    customer_id=account["ownerCustomerId"],
+                )
+                for account in accounts
+            )
+        )
+
+        return {
+            account["accountId"]: transactions
+            for account, transactions in zip(accounts, results)
+        }
+
+    async def get_accounts(self, customer_id: str = None) -> Sequence[Dict]:
+        """
+        Retrieve account information of all accounts available to a customer.
+        The accounts are cached for account_ttl seconds.
+        :param customer_id: The customer to make the request as. Defaults to the
+        customer id of the session.
+        :return: A list of dictionaries, each representing one account.
+        """
+        return (await self._get_account_index(customer_id)).accounts
+
+    async def get_account(self, account_name, customer_id=None) -> Optional[Dict]:
+        """
+        Retrieve account information for a specific account, id'd by the
+        account name and the customer id of the owner.
+
+        :param account_name: Name of the account
+        :param customer_id: Customer id of the owner of the account. Defaults to
+        the customer id of the session.
+        :return: The account if found, else None.
+        """
+        if customer_id is None:
+            customer_id = self.customer_id
+
+        index = await self._get_account_index(customer_id)
+
+        return index.by_name(account_name, customer_id)
+
+    async def get_account_by_id(
+        self, account_id: str, customer_id: str = None
+    ) -> Optional[Dict]:
+        """
+        Retrieve account information for a specific account by its account id.
+
+        :param account_id: The account id
+        :param customer_id: The customer to make the request as. Defaults to the
+        customer id of the session.
+        :return: The account if found, else None.
+        """
+        return (await self._get_account_index(customer_id)).by_id(account_id)
+
+    def invalidate_accounts(self):
+        """
+        Drop the cached accounts, so they are fetched again on next use.
+        """
+        for index in self.account_indexes.values():
+            index.invalidate()
+
+    async def _get_account_index(self, customer_id: str = None) -> AccountIndex:
+        if customer_id is None:
+            customer_id = self.customer_id
+
+        if customer_id not in self.account_indexes:
+            self.account_indexes[customer_id] = AccountIndex(self.account_ttl)
+            self._account_locks[customer_id] = asyncio.Lock()
+
+        index = self.account_indexes[customer_id]
+        async with self._account_locks[customer_id]:
+            if index.is_stale():
+                response = await self._get(f"{self.api_url}/Accounts", customer_id)
+                index.update(self._check_response(response)["items"])
+        return index
+
+    async def _get_token(self) -> Dict:
+        if self.token_cache is None:
+            return await self._fetch_token()
+
+        # The cache locks a file while fetching, so it runs in a thread, and
+        # the token is fetched on the event loop while that thread waits
+        loop = asyncio.get_running_loop()
+
+        def fetch_token() -> Dict:
+            return asyncio.run_coroutine_threadsafe(self._fetch_token(), loop).result()
+
+        return await loop.run_in_executor(
+            None, self.token_cache.fetch, self.client_id, fetch_token
+        )
+
+    async def _refresh_token(self, token: Dict):
+        while True:
+            await asyncio.sleep(self.token_cache.refresh_in(token))
+            token = await self._get_token()
+            self._token = token
+
+    async def _fetch_token(self) -> Dict:
+        async with self.session.post(
+            self.token_url,
+            data={"grant_type": "client_credentials"},
+            auth=aiohttp.BasicAuth(
+                self.client_id, urllib.parse.quote(self.client_secret)
+            ),
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def _get_transactions_page(
+        self,
+        account_id: str,
+        index: int,
+        length: int,
+        start_date,
+        end_date,
+        customer_id: str = None,
+    ) -> Dict:
+        queries = self._transaction_queries(index, length, start_date, end_date)
+        response = await self._get(
+            f"{self.api_url}/Transactions/{account_id}",
+            customer_id,
+            # aiohttp does not drop empty query parameters like requests does
+            params={key: value for key, value in queries.items() if value is not None},
+        )
+
+        return self._check_response(response)
+
+    async def _get(self, url: str, customer_id: str = None, params=None) -> Dict:
+        if self.session is None:
+            raise RuntimeError("Session is not open. Use 'async with' or open().")
+
+        attempt = 0
+        while True:
+            if self.scheduler is not None:
+                await asyncio.sleep(self.scheduler.reserve())
+
+            try:
+                async with self.session.get(
+                    url,
+                    headers={
+                        "Authorization": f'Bearer {self._token["access_token"]}',
+                        "customerId": customer_id if customer_id else self.customer_id,
+                    },
+                    params=params,
+                ) as response:
+                    delay = None
+                    if self.scheduler is not None:
+                        delay = self.scheduler.retry_delay(
+                            attempt,
+                            response.status,
+                            response.headers.get("Retry-After"),
+                        )
+                    if delay is None:
+                        if (
+                            self.scheduler is not None
+                            and response.status in self.scheduler.retry_statuses
+                        ):
+                            raise SbankenError(
+                                f"Request failed after {attempt} retries with status "
+                                f"{response.status}: {await response.text()}"
+                            )
+                        return await response.json()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if self.scheduler is None:
+                    raise
+                delay = self.scheduler.retry_delay(attempt)
+                if delay is None:
+                    raise
+
+            await asyncio.sleep(delay)
+            attempt += 1
@@ -0,0 +1,368 @@
+"""
+A local stand-in for the Sbanken API, serving seeded synthetic data.
+
+Implements the token, /Accounts and /Transactions/{accountId} endpoints with
+configurable volume, latency and error rate, so sessions can be exercised and
+benchmarked end to end without network access:
+
+    >>> with FakeSbankenServer(transactions_per_account=5000) as server:
+    ...     sbanken = SbankenSession(api_url=server.api_url, token_url=server.token_url)
+
+oauthlib refuses to fetch tokens over plain http unless the environment variable
+OAUTHLIB_INSECURE_TRANSPORT is set. Run standalone with:
+
+    python -m sbankensheets.sbanken.fake_server --port 8080
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.parse
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+_account_names = ("Brukskonto", "Sparekonto", "Regningskonto", "Buffer")
+
+_merchants = (
+    ("REMA 1000 MAJORSTUEN", 714, "VISA VARE"),
+    ("KIWI 505 BARCODE", 714, "VISA VARE"),
+    ("Spotify P0701F7525", 714, "VISA VARE"),
+    ("NARVESEN OSLO S", 714, "VISA VARE"),
+    ("Straksoverføring", 962, "Vipps straksbet."),
+    ("Ruter AS", 714, "VISA VARE"),
+    ("Fjordkraft AS", 561, "Nettgiro"),
+    ("Lønn ACME AS", 203, "Lønn"),
+    ("Til Sparekonto", 200, "Overføring"),
+)
+
+
+def generate_accounts(count: int, customer_id: str, seed: int = 0) -> List[Dict]:
+    rng = random.Random(seed)
+    accounts = []
+    for i in range(count):
+        name = _account_names[i] if i < len(_account_names) else f"Konto {i}"
+        balance = round(rng.uniform(0, 100000), 2)
+        accounts.append(
+            {
+                "accountId": f"{rng.getrandbits(128):032X}",
+                "accountNumber": f"9710{rng.randrange(10 ** 7):07d}",
+                "ownerCustomerId": customer_id,
+                "name": name,
+                "accountType": "Standard account",
+                "available": balance,
+                "balance": balance,
+                "creditLimit": 0.0,
+            }
+        )
+    return accounts
+
+
+def generate_transactions(
+    count: int, seed: int = 0, end_date: date = None, days: int = 365
+) -> List[Dict]:
+    """
+    Generate transactions shaped like the Sbanken API's, newest first.
+    :param count: The number of transactions.
+    :param seed: Seed for the random generator.
+    :param end_date: The latest accounting date. Defaults to today.
+    :param days: The number of days the transactions are spread over.
+    :return: A list of transaction dicts.
+    """
+    rng = random.Random(seed)
+    end_date = end_date if end_date else date.today()
+
+    transactions = []
+    for _ in range(count):
+        text, type_code, type_text = rng.choice(_merchants)
+        accounting_date = end_date - timedelta(days=rng.randrange(days))
+        timestamp = f"{accounting_date.isoformat()}T00:00:00+02:00"
+        amount = round(rng.uniform(5, 2000), 2)
+        incoming = type_code == 203 or (type_code == 962 and rng.random() < 0.3)
+        amount = amount if incoming else -amount
+
+        transaction = {
+            "accountingDate": timestamp,
+            "interestDate": timestamp,
+            "otherAccountNumberSpecified": False,
+            "amount": amount,
+            "text": text,
+            "transactionType": type_text,
+            "transactionTypeCode": type_code,
+            "transactionTypeText": type_text,
+            "isReservation": False,
+            "reservationType": None,
+            "source": "Archive",
+            "cardDetailsSpecified": False,
+        }
+
+        if type_code == 714:
+            purchase_date = accounting_date - timedelta(days=rng.randrange(4))
+            card_number = f"*{rng.randrange(10 ** 4):04d}"
+            transaction["text"] = (
+                f"{card_number} {purchase_date.strftime('%d.%m')} "
+                f"NOK {abs(amount):.2f} {text} Kurs: 1.0000"
+            )
+            transaction["cardDetailsSpecified"] = True
+            transaction["cardDetails"] = {
+                "cardNumber": card_number,
+                "currencyAmount": abs(amount),
+                "currencyRate": 1.0,
+                "merchantCategoryCode": "5411",
+                "merchantCategoryDescription": "Dagligvare",
+                "merchantCity": "Oslo",
+                "merchantName": text,
+                "originalCurrencyCode": "NOK",
+                "purchaseDate": f"{purchase_date.isoformat()}T00:00:00+02:00",
+                "transactionId": f"{rng.getrandbits(52)}",
+            }
+
+        transactions.append(transaction)
+
+    transactions.sort(key=lambda x: x["accountingDate"], reverse=True)
+    return transactions
+
+
+class FakeSbankenServer(object):
+    """
+    Local http server implementing the parts of the Sbanken API used by the
+    sessions, in a background thread.
+    """
+
+    access_token = "fake-access-token"
+
+    def __init__(
+        self,
+        accounts: int = 3,
+        transactions_per_account: int = 1000,
+        seed: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        customer_id: str = "12345678901",
+        end_date: date = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        :param accounts: The number of accounts.
+        :param transactions_per_account: The number of transactions per account.
+        :param seed: Seed for the synthetic data and the errors.
+        :param latency: Seconds each request is delayed.
+        :param error_rate: Share of api requests failing with 429 or 503.
+        :param customer_id: The owner of the accounts.
+        :param end_date: The latest accounting date. Defaults to today.
+        :param host: The host to listen on.
+        :param port: The port to listen on. Defaults to any free port.
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self.customer_id = customer_id
+        self.accounts = generate_accounts(accounts, customer_id, seed)
+        self.transactions = {
+            account["accountId"]: generate_transactions(
+                transactions_per_account, seed + i, end_date
+            )
+            for i, account in enumerate(self.accounts)
+        }
+        self.requests = 0
+        self.token_requests = 0
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/bank/api/v1"
+
+    @property
+    def token_url(self) -> str:
+        return f"{self.url}/identityserver/connect/token"
+
+    def __enter__(self) -> "FakeSbankenServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def _fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            return self._rng.random() < self.error_rate
+
+    def _list_accounts(self, customer_id: str) -> Dict:
+        return self._items(
+            [a for a in self.accounts if a["ownerCustomerId"] == customer_id]
+        )
+
+    def _list_transactions(self, account_id: str, queries: Dict) -> Dict:
+        if account_id not in self.transactions:
+            return self._error("NotFound", f"Account not found: {account_id}")
+
+        try:
+            index = int(queries.get("index", 0))
+            length = int(queries.get("length", 100))
+            end_date = (
+                date.fromisoformat(queries["endDate"][:10])
+                if queries.get("endDate")
+                else date.today()
+            )
+            start_date = (
+                date.fromisoformat(queries["startDate"][:10])
+                if queries.get("startDate")
+                else end_date - timedelta(days=30)
+            )
+        except ValueError as e:
+            return self._error("InvalidParameter", str(e))
+
+        start, end = start_date.isoformat(), end_date.isoformat()
+        matching = [
+            transaction
+            for transaction in self.transactions[account_id]
+            if start <= transaction["accountingDate"][:10] <= end
+        ]
+        return self._items(matching[index : index + length], len(matching))
+
+    @staticmethod
+    def _items(items: List, available_items: int = None) -> Dict:
+        return {
+            "availableItems": (
+                len(items) if available_items is None else available_items
+            ),
+            "items": items,
+            "errorType": None,
+            "isError": False,
+            "errorMessage": None,
+            "traceId": None,
+        }
+
+    @staticmethod
+    def _error(error_type: str, message: str) -> Dict:
+        return {
+            "availableItems": 0,
+            "items": [],
+            "errorType": error_type,
+            "isError": True,
+            "errorMessage": message,
+            "traceId": None,
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, body, headers: Dict = None):
+                payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                time.sleep(server.latency)
+                length = int(self.headers.get("Content-Length", 0))
+                form = urllib.parse.parse_qs(self.rfile.read(length).decode("utf-8"))
+
+                if (
+                    urllib.parse.urlsplit(self.path).path
+                    != "/identityserver/connect/token"
+                ):
+                    self._send_json(404, {"error": "not_found"})
+                elif form.get("grant_type") != ["client_credentials"]:
+                    self._send_json(400, {"error": "unsupported_grant_type"})
+                else:
+                    server.token_requests += 1
+                    self._send_json(
+                        200,
+                        {
+                            "access_token": server.access_token,
+                            "expires_in": 3600,
+                            "token_type": "Bearer",
+                        },
+                    )
+
+            def do_GET(self):
+                time.sleep(server.latency)
+                url = urllib.parse.urlsplit(self.path)
+                queries = dict(urllib.parse.parse_qsl(url.query))
+                parts = url.path.strip("/").split("/")
+
+                if self.headers.get("Authorization") != f"Bearer {server.access_token}":
+                    self._send_json(401, {"error": "invalid_token"})
+                elif server._fail():
+                    if server._rng.random() < 0.5:
+                        self._send_json(429, {}, {"Retry-After": "0"})
+                    else:
+                        self._send_json(503, {})
+                elif parts == ["bank", "api", "v1", "Accounts"]:
+                    customer_id = self.headers.get("customerId")
+                    self._send_json(200, server._list_accounts(customer_id))
+                elif (
+                    parts[:4] == ["bank", "api", "v1", "Transactions"]
+                    and len(parts) == 5
+                ):
+                    self._send_json(200, server._list_transactions(parts[4], queries))
+                else:
+                    self._send_json(404, {"error": "not_found"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--customer-id", default="12345678901")
+    args = parser.parse_args()
+
+    server = FakeSbankenServer(
+        accounts=args.accounts,
+        transactions_per_account=args.transactions,
+        seed=args.seed,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        customer_id=args.customer_id,
+        host=args.host,
+        port=args.port,
+    )
+    print(f"Serving fake Sbanken API on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
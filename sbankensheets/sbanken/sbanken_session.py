@@ -1,43 +1,192 @@
+import threading
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
 from os import environ
-from typing import List, Dict, Optional, Sequence, Iterable
+from typing import List, Dict, Optional, Sequence, Iterable, Iterator, Tuple
 
 import requests
 from oauthlib.oauth2 import BackendApplicationClient
 from requests_oauthlib import OAuth2Session
 
+from ..sbanken._json_stream import iter_json_array
+from ..sbanken.account_index import AccountIndex
 from ..sbanken.errors import SbankenError
-from ..sbanken.transaction import Transaction
+from ..sbanken.scheduler import RequestScheduler
+from ..sbanken.token_cache import TokenCache
+from ..sbanken.transaction import Transaction, filter_transactions
 
 
-class SbankenSession(object):
+class BaseSbankenSession(object):
     """
-    Class for handling HTTPS requests to the REST API from SBanken.
+    Response handling shared by the synchronous and asynchronous sessions.
     """
 
+    token_url = "https://auth.sbanken.no/identityserver/connect/token"
+    api_url = "https://api.sbanken.no/bank/api/v1"
+
     unbooked_text_keywords = tuple(
         map(str.lower, ("Varekjøp", "Varekjøp VISA", "VISA"))
     )
     unstable_transaction_keys = ("transactionId", "source", "reservationType")
 
+    @staticmethod
+    def _check_response(response: Dict) -> Dict:
+        if response["isError"]:
+            raise SbankenError(f'{response["errorType"]} {response["errorMessage"]}')
+        return response
+
+    @staticmethod
+    def _transaction_queries(index: int, length: int, start_date, end_date) -> Dict:
+        return {
+            "index": str(index),
+            "length": str(length),
+            "startDate": start_date,
+            "endDate": end_date,
+        }
+
+    def _to_booked_transactions(self, data: List[Dict]) -> List[Transaction]:
+        if "transactionId" in data:
+            print("TransactionId present")
+
+        self._remove_unstable_transaction_keys(data)
+
+        transactions = (Transaction(transaction) for transaction in data)
+        return self._remove_unbooked_transactions(transactions)
+
+    def _iter_booked_transactions(self, data: Iterable[Dict]) -> Iterator[Transaction]:
+        for transaction in data:
+            self._remove_unstable_transaction_keys([transaction])
+            yield from self._remove_unbooked_transactions([Transaction(transaction)])
+
+    def _remove_unstable_transaction_keys(self, data):
+        """
+        These keywords are unstable from Sbanken.
+
+        Sometimes they appear, sometimes not. This affects the encoding, if not handled.
+        """
+        for transaction in data:
+            for keyword in self.unstable_transaction_keys:
+                if keyword in transaction:
+                    del transaction[keyword]
+
+    def _remove_unbooked_transactions(
+        self, transactions: Iterable[Transaction]
+    ) -> List[Transaction]:
+        for_keeps = filter(
+            lambda transaction: all(
+                keyword != transaction.text.lower()
+                for keyword in self.unbooked_text_keywords
+            ),
+            transactions,
+        )
+
+        return list(for_keeps)
+
+
+class SbankenSession(BaseSbankenSession):
+    """
+    Class for handling HTTPS requests to the REST API from SBanken.
+    """
+
+    stream_chunk_size = 64 * 1024
+
     @staticmethod
     def _create_authenticated_http_session(
-        client_id: str, client_secret: str
+        client_id: str,
+        client_secret: str,
+        token_cache: TokenCache = None,
+        token_url: str = None,
     ) -> requests.Session:
         oauth2_client = BackendApplicationClient(client_id=client_id)
         session = OAuth2Session(client=oauth2_client)
-        session.fetch_token(
-            token_url="https://auth.sbanken.no/identityserver/connect/token",
+        if token_cache is None:
+            SbankenSession._fetch_token(session, client_id, client_secret, token_url)
+        else:
+            session.token = token_cache.fetch(
+                client_id,
+                lambda: SbankenSession._fetch_token(
+                    session, client_id, client_secret, token_url
+                ),
+            )
+        return session
+
+    @staticmethod
+    def _fetch_token(
+        session: OAuth2Session, client_id: str, client_secret: str, token_url=None
+    ):
+        return session.fetch_token(
+            token_url=token_url if token_url else SbankenSession.token_url,
             client_id=client_id,
             client_secret=urllib.parse.quote(client_secret),
         )
-        return session
 
-    def __init__(self):
+    def __init__(
+        self,
+        token_cache: TokenCache = None,
+        account_ttl: float = 300,
+        scheduler: RequestScheduler = None,
+        api_url: str = None,
+        token_url: str = None,
+    ):
+        """
+        :param token_cache: Cache to reuse access tokens from. If given, the
+        token is also refreshed in the background shortly before it expires.
+        :param account_ttl: Seconds the accounts are cached before fetched again.
+        :param scheduler: Scheduler pacing and retrying the requests, which may
+        be shared with other sessions.
+        :param api_url: Base url of the bank api. Defaults to Sbanken's.
+        :param token_url: Url of the identity server token endpoint. Defaults to Sbanken's.
+        """
+        if api_url:
+            self.api_url = api_url
+        if token_url:
+            self.token_url = token_url
+        self.client_id = environ["CLIENT_ID"]
+        self.client_secret = environ["CLIENT_SECRET"]
+        self.token_cache = token_cache
         self.session = SbankenSession._create_authenticated_http_session(
-            environ["CLIENT_ID"], environ["CLIENT_SECRET"]
+            self.client_id, self.client_secret, token_cache, self.token_url
         )
         self.customer_id = environ["CUSTOMER_ID"]
+        self.account_index = AccountIndex(account_ttl)
+        self.scheduler = scheduler
+        self._account_lock = threading.Lock()
+
+        self._refresh_timer = None
+        if token_cache is not None:
+            self._schedule_token_refresh(self.session.token)
+
+    def close(self):
+        """
+        Stop refreshing the access token and close the http session.
+        """
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+            self._refresh_timer = None
+        self.session.close()
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        if self.scheduler is None:
+            return self.session.get(url, **kwargs)
+        return self.scheduler.request(lambda: self.session.get(url, **kwargs))
+
+    def _schedule_token_refresh(self, token: Dict):
+        self._refresh_timer = threading.Timer(
+            self.token_cache.refresh_in(token), self._refresh_token
+        )
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_token(self):
+        token = self.token_cache.fetch(
+            self.client_id,
+            lambda: SbankenSession._fetch_token(
+                self.session, self.client_id, self.client_secret, self.token_url
+            ),
+        )
+        self.session.token = token
+        self._schedule_token_refresh(token)
 
     def get_transactions(
         self,
@@ -56,47 +205,179 @@ class SbankenSession(object):
         :param end_date: The end date of the transactions. Defaults to today's date.
         :return: A list of Transaction objects.
         """
-        queries = {
-            "index": str(index),
-            "length": str(length),
-            "startDate": start_date,
-            "endDate": end_date,
-        }
+        response = self._get_transactions_page(
+            account_id, index, length, start_date, end_date
+        )
 
-        response = self.session.get(
-            f"https://api.sbanken.no/bank/api/v1/Transactions/{account_id}",
-            headers={"customerId": self.customer_id},
-            params=queries,
-        ).json()
+        return self._to_booked_transactions(response["items"])
 
-        if response["isError"]:
-            raise SbankenError(f'{response["errorType"]} {response["errorMessage"]}')
+    def get_all_transactions(
+        self,
+        account_id: str,
+        start_date=None,
+        end_date=None,
+        page_size: int = 1000,
+        max_workers: int = 4,
+    ) -> List[Transaction]:
+        """
+        Get every transaction from the given account id within the date range,
+        paginating automatically.
 
-        data = response["items"]
-        if "transactionId" in data:
-            print("TransactionId present")
+        The first page is fetched on its own to learn the total number of
+        transactions from 'availableItems'. The remaining pages are then fetched
+        concurrently and stitched back together in the order Sbanken returns them.
+        :param account_id: The account id to retrieve transactions from
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :param page_size: The number of transactions to request per page.
+        :param max_workers: The maximum number of pages fetched at the same time.
+        :return: A list of Transaction objects.
+        """
+        if page_size < 1:
+            raise ValueError(f"page_size must be > 0: {page_size}")
 
-        self._remove_unstable_transaction_keys(data)
+        first_page = self._get_transactions_page(
+            account_id, 0, page_size, start_date, end_date
+        )
+        items = list(first_page["items"])
 
-        transactions = (Transaction(transaction) for transaction in data)
-        booked_transactions = self._remove_unbooked_transactions(transactions)
+        available_items = first_page.get("availableItems", len(items))
+        indices = range(page_size, available_items, page_size)
+
+        if indices:
+            with ThreadPoolExecutor(
+                max_workers=max(1, min(max_workers, len(indices)))
+            ) as executor:
+                pages = executor.map(
+                    lambda index: self._get_transactions_page(
+                        account_id, index, page_size, start_date, end_date
+                    ),
+                    indices,
+                )
+                for page in pages:
+                    items.extend(page["items"])
+
+        return self._to_booked_transactions(items)
+
+    def backfill_transactions(
+        self,
+        account_id: str,
+        start_date,
+        end_date=None,
+        shard="month",
+        max_workers: int = 4,
+        page_size: int = 1000,
+    ) -> List[Transaction]:
+        """
+        Get every transaction from the given account id within a long date range,
+        by splitting the range into shards which are fetched in parallel.
+
+        The shards are merged newest first, like Sbanken orders transactions,
+        and transactions returned by two neighbouring shards are only kept once.
+        :param account_id: The account id to retrieve transactions from
+        :param start_date: The start date of the backfill.
+        :param end_date: The end date of the backfill. Defaults to today's date.
+        :param shard: 'month', 'week' or a number of days per shard.
+        :param max_workers: The maximum number of shards fetched at the same time.
+        :param page_size: The number of transactions to request per page.
+        :return: A list of Transaction objects.
+        """
+        shards = date_shards(start_date, end_date or date.today(), shard)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = executor.map(
+                lambda dates: self.get_all_transactions(
+                    account_id,
+                    start_date=dates[0].isoformat(),
+                    end_date=dates[1].isoformat(),
+                    page_size=page_size,
+                    max_workers=1,
+                ),
+                reversed(shards),
+            )
+
+            merged = []
+            newer = []
+            for transactions in results:
+                merged.extend(filter_transactions(transactions, newer))
+                newer = [transaction.id for transaction in transactions]
+
+        return merged
+
+    def iter_transactions(
+        self,
+        account_id: str,
+        index: int = 0,
+        length: int = 100,
+        start_date=None,
+        end_date=None,
+        fields: Dict = None,
+    ) -> Iterator[Transaction]:
+        """
+        Stream the transactions from the given account id. The response is parsed
+        incrementally, yielding each booked transaction as soon as it is read.
+        :param account_id: The account id to retrieve transactions from
+        :param index: The start index of the transactions.
+        :param length: The maximum number of transactions to return
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :param fields: Optional dict receiving the other members of the response,
+        such as 'availableItems'.
+        :return: An iterator of Transaction objects.
+        """
+        if fields is None:
+            fields = {}
+
+        with self._get(
+            f"{self.api_url}/Transactions/{account_id}",
+            headers={"customerId": self.customer_id},
+            params=self._transaction_queries(index, length, start_date, end_date),
+            stream=True,
+        ) as response:
+            items = iter_json_array(
+                response.iter_content(chunk_size=self.stream_chunk_size),
+                "items",
+                fields,
+            )
+            for item in items:
+                # Drain the rest of an error response for its error message
+                if not fields.get("isError"):
+                    yield from self._iter_booked_transactions([item])
+
+        self._check_response(fields)
+
+    def iter_all_transactions(
+        self, account_id: str, start_date=None, end_date=None, page_size: int = 1000
+    ) -> Iterator[Transaction]:
+        """
+        Stream every transaction from the given account id within the date range,
+        one page at a time, so that at most one page is held in memory.
+        :param account_id: The account id to retrieve transactions from
+        :param start_date: The start date of the transactions. Defaults to 30 days before end date.
+        :param end_date: The end date of the transactions. Defaults to today's date.
+        :param page_size: The number of transactions to request per page.
+        :return: An iterator of Transaction objects.
+        """
+        if page_size < 1:
+            raise ValueError(f"page_size must be > 0: {page_size}")
 
-        return booked_transactions
+        index = 0
+        while True:
+            fields = {}
+            yield from self.iter_transactions(
+                account_id, index, page_size, start_date, end_date, fields
+            )
+            index += page_size
+            if index >= fields.get("availableItems", 0):
+                return
 
     def get_accounts(self) -> Sequence[Dict]:
         """
         Retrieve account information of all accounts for Sbanken object.
+        The accounts are cached for account_ttl seconds.
         :return: A list of dictionaries, each representing one account.
         """
-        response = self.session.get(
-            "https://api.sbanken.no/bank/api/v1/Accounts",
-            headers={"customerId": self.customer_id},
-        ).json()
-
-        if not response["isError"]:
-            return response["items"]
-        else:
-            raise SbankenError(f'{response["errorType"]} {response["errorMessage"]}')
+        return self._get_account_index().accounts
 
     def get_account(self, account_name, customer_id=None) -> Optional[Dict]:
         """
@@ -111,45 +392,81 @@ class SbankenSession(object):
         if customer_id is None:
             customer_id = self.customer_id
 
-        response = self.session.get(
-            "https://api.sbanken.no/bank/api/v1/Accounts",
+        return self._get_account_index().by_name(account_name, customer_id)
+
+    def get_account_by_id(self, account_id: str) -> Optional[Dict]:
+        """
+        Retrieve account information for a specific account by its account id.
+
+        :param account_id: The account id
+        :return: The account if found, else None.
+        """
+        return self._get_account_index().by_id(account_id)
+
+    def invalidate_accounts(self):
+        """
+        Drop the cached accounts, so they are fetched again on next use.
+        """
+        self.account_index.invalidate()
+
+    def _get_account_index(self) -> AccountIndex:
+        with self._account_lock:
+            if self.account_index.is_stale():
+                response = self._get(
+                    f"{self.api_url}/Accounts", headers={"customerId": self.customer_id}
+                ).json()
+                self.account_index.update(self._check_response(response)["items"])
+            return self.account_index
+
+    def _get_transactions_page(
+        self, account_id: str, index: int, length: int, start_date, end_date
+    ) -> Dict:
+        response = self._get(
+            f"{self.api_url}/Transactions/{account_id}",
             headers={"customerId": self.customer_id},
+            params=self._transaction_queries(index, length, start_date, end_date),
         ).json()
 
-        if response["isError"]:
-            raise SbankenError(f'{response["errorType"]} {response["errorMessage"]}')
+        return self._check_response(response)
 
-        accounts = response["items"]
 
-        for account in accounts:
-            if (
-                account["name"] == account_name
-                and account["ownerCustomerId"] == customer_id
-            ):
-                return account
+def date_shards(start_date, end_date, shard="month") -> List[Tuple[date, date]]:
+    """
+    Split a date range into consecutive, non-overlapping shards.
+    :param start_date: The first date of the range, as a date or an ISO formatted string.
+    :param end_date: The last date of the range, as a date or an ISO formatted string.
+    :param shard: 'month' for calendar months, 'week' for weeks starting on
+    Mondays, or a number of days per shard.
+    :return: A list of (first date, last date) tuples, oldest first.
+    """
+    if isinstance(start_date, str):
+        start_date = date.fromisoformat(start_date)
+    if isinstance(end_date, str):
+        end_date = date.fromisoformat(end_date)
 
-        return None
+    if shard == "month":
 
-    def _remove_unstable_transaction_keys(self, data):
-        """
-        These keywords are unstable from Sbanken.
+        def next_start(day: date) -> date:
+            return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
 
-        Sometimes they appear, sometimes not. This affects the encoding, if not handled.
-        """
-        for transaction in data:
-            for keyword in self.unstable_transaction_keys:
-                if keyword in transaction:
-                    del transaction[keyword]
+    elif shard == "week":
 
-    def _remove_unbooked_transactions(
-        self, transactions: Iterable[Transaction]
-    ) -> List[Transaction]:
-        for_keeps = filter(
-            lambda transaction: all(
-                keyword != transaction.text.lower()
-                for keyword in self.unbooked_text_keywords
-            ),
-            transactions,
-        )
+        def next_start(day: date) -> date:
+            return day + timedelta(days=7 - day.weekday())
 
-        return list(for_keeps)
+    elif isinstance(shard, int) and shard > 0:
+
+        def next_start(day: date) -> date:
+            return day + timedelta(days=shard)
+
+    else:
+        raise ValueError(f"shard must be 'month', 'week' or a positive int: {shard}")
+
+    shards = []
+    first = start_date
+    while first <= end_date:
+        following = next_start(first)
+        shards.append((first, min(following - timedelta(days=1), end_date)))
+        first = following
+
+    return shards
@@ -0,0 +1,152 @@
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import requests
+
+from ..sbanken.errors import SbankenError
+
+
+@dataclass
+class SchedulerStats:
+    requests: int = 0
+    throttled: int = 0
+    retried: int = 0
+
+
+class RequestScheduler(object):
+    """
+    Paces and retries idempotent requests to the Sbanken API. One scheduler can
+    be shared by several sessions and threads.
+
+    Requests are paced by a token bucket. Throttled (429) and transient server
+    error (5xx) responses, as well as connection errors, are retried with
+    jittered exponential backoff, or after the delay given by Retry-After.
+    A throttled response pauses every request going through the scheduler.
+    """
+
+    retry_statuses = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        rate: float = 5.0,
+        burst: int = 5,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_cap: float = 30.0,
+    ):
+        """
+        :param rate: Requests per second allowed on average.
+        :param burst: Requests allowed at once after an idle period.
+        :param max_retries: The maximum number of retries per request.
+        :param backoff_base: Upper bound of the first backoff delay, in seconds.
+        :param backoff_cap: Upper bound of any backoff delay, in seconds.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.stats = SchedulerStats()
+
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+
+    def reserve(self) -> float:
+        """
+        Reserve the right to send one request.
+        :return: Seconds to wait before sending it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            self.stats.requests += 1
+
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(delay, self._paused_until - now)
+
+    def retry_delay(
+        self, attempt: int, status: int = None, retry_after: str = None
+    ) -> Optional[float]:
+        """
+        Decide whether a request should be retried.
+        :param attempt: The number of the failed attempt, starting at 0.
+        :param status: The http status of the response, or None for a connection error.
+        :param retry_after: The Retry-After header of the response, if any.
+        :return: Seconds to wait before retrying, or None if it should not be retried.
+        """
+        if status is not None and status not in self.retry_statuses:
+            return None
+        if attempt >= self.max_retries:
+            return None
+
+        delay = self._parse_retry_after(retry_after)
+        if delay is None:
+            # Full jitter
+            delay = random.uniform(
+                0, min(self.backoff_cap, self.backoff_base * 2**attempt)
+            )
+
+        with self._lock:
+            self.stats.retried += 1
+            if status == 429:
+                self.stats.throttled += 1
+                self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+        return delay
+
+    def request(self, send: Callable[[], requests.Response]) -> requests.Response:
+        """
+        Send a request when allowed, retrying it if it fails transiently.
+        :param send: Function sending the request.
+        :return: The final response.
+        :raises SbankenError: If the request still fails transiently after
+        max_retries retries.
+        """
+        attempt = 0
+        while True:
+            time.sleep(self.reserve())
+            try:
+                response = send()
+            except (requests.ConnectionError, requests.Timeout):
+                delay = self.retry_delay(attempt)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_delay(
+                    attempt, response.status_code, response.headers.get("Retry-After")
+                )
+                if delay is None:
+                    if response.status_code in self.retry_statuses:
+                        raise SbankenError(
+                            f"Request failed after {attempt} retries with status "
+                            f"{response.status_code}: {response.text}"
+                        )
+                    return response
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    def _parse_retry_after(retry_after: str) -> Optional[float]:
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Dict, Optional
+
+from .._state import cache_path, locked, read_json, write_json
+
+
+class TokenCache(object):
+    """
+    On-disk cache of OAuth tokens, keyed by client id.
+
+    The cache file is guarded by a file lock, so threads and processes sharing
+    it will reuse one another's tokens rather than each fetching their own.
+    """
+
+    def __init__(self, path: str = None, refresh_margin: float = 60):
+        """
+        :param path: Path to the cache file. Defaults to tokens.json in the
+        sbankensheets cache directory.
+        :param refresh_margin: Seconds before expiry a token is considered stale.
+        """
+        self.path = path if path else cache_path("tokens.json")
+        self.refresh_margin = refresh_margin
+
+    def get(self, client_id: str) -> Optional[Dict]:
+        """
+        Get a cached token which is still valid.
+        :param client_id: The client id the token was issued to.
+        :return: The token if it is cached and not about to expire, else None.
+        """
+        with locked(self.path):
+            return self._get(client_id)
+
+    def put(self, client_id: str, token: Dict) -> Dict:
+        """
+        Store a token for a client id.
+        :param client_id: The client id the token was issued to.
+        :param token: The token. If it has no 'expires_at', it is derived from 'expires_in'.
+        :return: The token as stored.
+        """
+        token = self._with_expires_at(token)
+        with locked(self.path):
+            self._put(client_id, token)
+        return token
+
+    def fetch(self, client_id: str, fetch_token: Callable[[], Dict]) -> Dict:
+        """
+        Get a valid token, calling fetch_token only if no valid token is cached.
+
+        The lock is held while fetching, so concurrent callers wait for a single
+        fetch instead of all requesting a token.
+        :param client_id: The client id the token is issued to.
+        :param fetch_token: Function requesting a new token from the identity server.
+        :return: A valid token.
+        """
+        with locked(self.path):
+            token = self._get(client_id)
+            if token is None:
+                token = self._with_expires_at(fetch_token())
+                self._put(client_id, token)
+            return token
+
+    def refresh_in(self, token: Dict) -> float:
+        """
+        :return: Seconds until the token should be refreshed.
+        """
+        return max(0.0, token["expires_at"] - self.refresh_margin - time.time())
+
+    def _get(self, client_id: str) -> Optional[Dict]:
+        token = read_json(self.path, {}).get(client_id)
+        if token is None or self.refresh_in(token) <= 0:
+            return None
+        return token
+
+    def _put(self, client_id: str, token: Dict):
+        tokens = read_json(self.path, {})
+        tokens[client_id] = token
+        write_json(self.path, tokens)
+
+    @staticmethod
+    def _with_expires_at(token: Dict) -> Dict:
+        token = dict(token)
+        if "expires_at" not in token:
+            token["expires_at"] = time.time() + float(token.get("expires_in", 0))
+        return token
@@ -1,18 +1,132 @@
 import base64
+import hashlib
+import json
 import pickle
+import re
+from collections import Counter
+from datetime import date
+from functools import lru_cache
 from typing import List, Dict, Iterable, Sequence
 
 import dateutil.parser
 
+_id_length = 32
+_hex_digits = frozenset("0123456789abcdef")
+
+
+_date_token = re.compile(r"\d{1,2}\.\d{1,2}(?:\.\d{2,4})?\Z")
+_time_token = re.compile(r"\d{1,2}:\d{2}(?::\d{2})?\Z")
+_number_token = re.compile(r"\d+(?:[.,]\d+)?\Z")
+
+
+def _is_volatile_token(token: str) -> bool:
+    """
+    Whether a token of a transaction text varies between purchases at the same
+    merchant. Only digit runs like terminal ids and reference numbers, dates
+    and times are. Tokens with letters, like REMA1000, are kept.
+    """
+    if token.isdigit():
+        # Short numbers are often part of the name, like REMA 1000
+        return len(token) >= 5
+    return bool(_date_token.match(token) or _time_token.match(token))
+
+
+def normalize_merchant(text: str) -> str:
+    """
+    Reduce a transaction text to a canonical merchant key, by lowercasing it
+    and removing card numbers, dates, amounts, exchange rates and reference
+    numbers. Card purchases keep their leading '*', so a '*' keyword still
+    matches them.
+
+    >>> normalize_merchant("*0054 11.08 NOK 109.00 Spotify 4029357733 Kurs: 1.0000")
+    '* spotify'
+    """
+    text = text.lower()
+
+    # Card purchases start with card number, date, currency and amount, and
+    # end with the exchange rate. The rest repeats between purchases.
+    if text[:1] == "*":
+        head, separator, rate = text.rpartition(" kurs: ")
+        if separator and _number_token.match(rate):
+            text = head
+
+        tokens = text.split(None, 4)
+        if tokens[0][1:].isdigit():
+            if (
+                len(tokens) == 5
+                and _date_token.match(tokens[1])
+                and len(tokens[2]) == 3
+                and tokens[2].isalpha()
+                and _number_token.match(tokens[3])
+            ):
+                text = "* " + tokens[4]
+            else:
+                text = "* " + text[len(tokens[0]) :]
+
+    return _remove_volatile_tokens(text)
+
+
+@lru_cache(maxsize=4096)
+def _remove_volatile_tokens(text: str) -> str:
+    return " ".join(token for token in text.split() if not _is_volatile_token(token))
+
+
+@lru_cache(maxsize=4096)
+def parse_date(timestamp: str) -> date:
+    """
+    Parse the date of a timestamp from the Sbanken API.
+
+    Sbanken returns ISO 8601 timestamps, like 2018-08-14T00:00:00+02:00, whose
+    date is read directly. Anything else is left to dateutil. Results are
+    memoized, as many transactions share the same timestamps.
+    :param timestamp: The timestamp to parse.
+    :return: The date of the timestamp, in its own time zone.
+    """
+    if timestamp[10:11] in ("T", ""):
+        try:
+            return date.fromisoformat(timestamp[:10])
+        except ValueError:
+            pass
+    return dateutil.parser.parse(timestamp).date()
+
 
 class Transaction(object):
     """
     Class representing a transaction obtained by Sbanken.
+
+    The fields used for categorizing and writing rows are extracted once, while
+    the id and dates are computed on first use and cached.
     """
 
+    __slots__ = (
+        "_data",
+        "_id",
+        "_accounting_date",
+        "_date",
+        "_merchant",
+        "amount",
+        "text",
+        "transaction_type",
+        "transaction_type_code",
+        "category",
+    )
+
+    amount: float
+    text: str
+    transaction_type: str
+    transaction_type_code: int
+    category: str
+
     def __init__(self, data):
         self._data = data
-        self._id = self._encode()
+        self._id = None
+        self._accounting_date = None
+        self._date = None
+        self._merchant = None
+        self.amount = data.get("amount")
+        self.text = data.get("text")
+        self.transaction_type = data.get("transactionType")
+        self.transaction_type_code = data.get("transactionTypeCode")
         self.category = ""
 
     def __str__(self):
@@ -22,40 +136,44 @@ class Transaction(object):
         return str(self._data)
 
     @property
-    def amount(self) -> float:
-        return self._data["amount"]
-
-    @property
-    def transaction_type(self):
-        return self._data["transactionType"]
-
-    @property
-    def transaction_type_code(self) -> int:
-        return self._data["transactionTypeCode"]
+    def accounting_date(self) -> date:
+        if self._accounting_date is None:
+            self._accounting_date = parse_date(self._data["accountingDate"])
+        return self._accounting_date
 
     @property
-    def text(self) -> str:
-        return self._data["text"]
-
-    @property
-    def category(self) -> str:
-        return self._category
-
-    @category.setter
-    def category(self, value: str):
-        self._category = value
+    def merchant(self) -> str:
+        """
+        The canonical merchant key of the transaction text.
+        """
+        if self._merchant is None:
+            self._merchant = normalize_merchant(self.text)
+        return self._merchant
 
     @property
     def id(self) -> str:
+        if self._id is None:
+            self._id = self.content_hash
         return self._id
 
+    @property
+    def content_hash(self) -> str:
+        """
+        A fixed-length digest of the transaction content. Transactions with
+        identical content have identical hashes. Used as the transaction id.
+        """
+        canonical = json.dumps(
+            self._data, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
     def to_csv(self) -> str:
         return ",".join(
             [self.text, str(self.amount), self.category.value if self.category else ""]
         )
 
     def to_sheets_row(self, encode: bool = False) -> Sequence[str]:
-        result = [self._encode()] if encode else []
+        result = [self.id] if encode else []
         return result + [
             self.extract_date(),
             str(self.amount if self.amount > 0 else -self.amount).replace(".", ","),
@@ -64,14 +182,16 @@ class Transaction(object):
         ]
 
     def extract_date(self) -> str:
-        data = self._data
+        if self._date is None:
+            data = self._data
 
-        if data["cardDetailsSpecified"]:
-            time = dateutil.parser.parse(data["cardDetails"]["purchaseDate"])
-        else:
-            time = dateutil.parser.parse(data["accountingDate"])
+            if data["cardDetailsSpecified"]:
+                time = parse_date(data["cardDetails"]["purchaseDate"])
+            else:
+                time = parse_date(data["accountingDate"])
 
-        return time.date().isoformat()
+            self._date = time.isoformat()
+        return self._date
 
     @staticmethod
     def from_id(id: str) -> "Transaction":
@@ -105,11 +225,46 @@ def divide_transactions(
     return result
 
 
-def filter_transactions(first: Iterable[Transaction], second: Iterable[Transaction]):
-    second_data = list(map(lambda x: x._data, second))
-    filtered = list(filter(lambda x: x._data not in second_data, first))
+def filter_transactions(
+    first: Iterable[Transaction], second: Iterable[str]
+) -> List[Transaction]:
+    """
+    Remove the transactions in first whose ids are in second. Ids are counted,
+    so identical transactions are only removed as many times as their id
+    occurs in second, keeping the surplus occurrences.
+    :param first: The transactions to filter.
+    :param second: The ids of the transactions already present.
+    :return: The transactions of first not present in second, in order.
+    """
+    remaining = Counter(second)
+    filtered = []
+    for transaction in first:
+        if remaining[transaction.id] > 0:
+            remaining[transaction.id] -= 1
+        else:
+            filtered.append(transaction)
     return filtered
 
 
 def cell_values_to_transactions(cell_values: Iterable) -> Iterable:
     return map(lambda x: Transaction._decode(x[0]), cell_values)
+
+
+def cell_values_to_ids(cell_values: Iterable) -> Iterable[str]:
+    return map(lambda x: migrate_id(x[0]), cell_values)
+
+
+def is_legacy_id(id: str) -> bool:
+    """
+    Whether id is a base64 encoded pickle of the transaction content, as
+    written by earlier versions, rather than a content hash.
+    """
+    return len(id) != _id_length or not all(c in _hex_digits for c in id)
+
+
+def migrate_id(id: str) -> str:
+    """
+    Convert a legacy id to the content hash id of the same transaction. Content
+    hash ids are returned as is.
+    """
+    return Transaction._decode(id).id if is_legacy_id(id) else id
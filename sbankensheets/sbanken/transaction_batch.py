@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .transaction import Transaction
+
+_epoch = date(1970, 1, 1).toordinal()
+
+
+@dataclass(frozen=True)
+class Rule:
+    """
+    Declarative predicate over transactions, usable in place of a lambda.
+    Conditions left as None match any transaction, and all given conditions
+    must match.
+    """
+
+    # -1 for outgoing (negative) amounts, 1 for incoming (positive) amounts
+    sign: Optional[int] = None
+    type_codes: Optional[Tuple[int, ...]] = None
+    exclude_type_codes: Tuple[int, ...] = ()
+    min_amount: Optional[float] = None
+    max_amount: Optional[float] = None
+    # Inclusive ISO dates, compared with the accounting date
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+    def __call__(self, transaction: Transaction) -> bool:
+        amount = transaction.amount
+        code = transaction.transaction_type_code
+        if self.sign is not None and not amount * self.sign > 0:
+            return False
+        if self.type_codes is not None and code not in self.type_codes:
+            return False
+        if code in self.exclude_type_codes:
+            return False
+        if self.min_amount is not None and amount < self.min_amount:
+            return False
+        if self.max_amount is not None and amount > self.max_amount:
+            return False
+        if self.start_date is not None or self.end_date is not None:
+            accounting_date = transaction.accounting_date.isoformat()
+            if self.start_date is not None and accounting_date < self.start_date:
+                return False
+            if self.end_date is not None and accounting_date > self.end_date:
+                return False
+        return True
+
+    def mask(self, batch: "TransactionBatch") -> np.ndarray:
+        """
+        :return: A boolean array marking the transactions of batch matching the rule.
+        """
+        mask = np.ones(len(batch), dtype=bool)
+        if self.sign is not None:
+            mask &= batch.amount * self.sign > 0
+        if self.type_codes is not None:
+            mask &= np.isin(batch.transaction_type_code, self.type_codes)
+        if self.exclude_type_codes:
+            mask &= ~np.isin(batch.transaction_type_code, self.exclude_type_codes)
+        if self.min_amount is not None:
+            mask &= batch.amount >= self.min_amount
+        if self.max_amount is not None:
+            mask &= batch.amount <= self.max_amount
+        if self.start_date is not None:
+            mask &= batch.accounting_date >= np.datetime64(self.start_date, "D")
+        if self.end_date is not None:
+            mask &= batch.accounting_date <= np.datetime64(self.end_date, "D")
+        return mask
+
+
+@dataclass
+class Summary:
+    count: int = 0
+    total: float = 0.0
+
+
+class TransactionBatch(object):
+    """
+    Columnar view of a sequence of transactions, with the amount, transaction
+    type code and accounting date in NumPy arrays, so rules are evaluated as
+    vectorized masks rather than one predicate call per transaction.
+
+    Iterating a batch yields its transactions in their original order.
+    """
+
+    def __init__(self, transactions: Iterable[Transaction]):
+        transactions = list(transactions)
+        count = len(transactions)
+
+        self.transactions = np.empty(count, dtype=object)
+        self.transactions[:] = transactions
+        self.amount = np.fromiter(
+            (t.amount for t in transactions), dtype=np.float64, count=count
+        )
+        self.transaction_type_code = np.fromiter(
+            (t.transaction_type_code for t in transactions), dtype=np.int64, count=count
+        )
+        self._accounting_date = None
+        self.text = np.empty(count, dtype=object)
+        self.text[:] = [t.text for t in transactions]
+
+    @property
+    def accounting_date(self) -> np.ndarray:
+        """
+        The accounting dates, parsed on first use, as only date rules need them.
+        """
+        if self._accounting_date is None:
+            # Converting date objects one by one is slow, days since epoch are not
+            self._accounting_date = np.fromiter(
+                (t.accounting_date.toordinal() - _epoch for t in self.transactions),
+                dtype=np.int64,
+                count=len(self.transactions),
+            ).astype("datetime64[D]")
+        return self._accounting_date
+
+    def __len__(self) -> int:
+        return len(self.transactions)
+
+    def __iter__(self) -> Iterator[Transaction]:
+        return iter(self.transactions)
+
+    def __getitem__(
+        self, key: Union[int, slice, np.ndarray]
+    ) -> Union[Transaction, "TransactionBatch"]:
+        """
+        Index a single transaction, or select a sub-batch by slice, boolean
+        mask or array of indices.
+        """
+        if isinstance(key, (int, np.integer)):
+            return self.transactions[key]
+
+        batch = TransactionBatch.__new__(TransactionBatch)
+        batch.transactions = self.transactions[key]
+        batch.amount = self.amount[key]
+        batch.transaction_type_code = self.transaction_type_code[key]
+        batch._accounting_date = (
+            None if self._accounting_date is None else self._accounting_date[key]
+        )
+        batch.text = self.text[key]
+        return batch
+
+    def select(self, rule: Rule) -> "TransactionBatch":
+        return self[rule.mask(self)]
+
+    def divide(
+        self, rules: Sequence[Tuple[str, Rule]]
+    ) -> Dict[str, "TransactionBatch"]:
+        """
+        Vectorized divide_transactions. A transaction matching several rules
+        is included under each of them.
+        :param rules: Pairs of name and rule.
+        :return: The matching transactions by name.
+        """
+        return {name: self.select(rule) for name, rule in rules}
+
+    def summarize(self, rules: Sequence[Tuple[str, Rule]]) -> Dict[str, Summary]:
+        """
+        :param rules: Pairs of name and rule.
+        :return: The number and total amount of the matching transactions by name.
+        """
+        result = {}
+        for name, rule in rules:
+            mask = rule.mask(self)
+            result[name] = Summary(
+                int(np.count_nonzero(mask)), float(self.amount[mask].sum())
+            )
+        return result
+
+    def summarize_by_merchant(self) -> Dict[str, Summary]:
+        """
+        :return: The number and total amount of the transactions by merchant key.
+        """
+        merchants = np.empty(len(self), dtype=object)
+        merchants[:] = [transaction.merchant for transaction in self.transactions]
+        keys, inverse = np.unique(merchants, return_inverse=True)
+        counts = np.bincount(inverse, minlength=len(keys))
+        totals = np.bincount(inverse, weights=self.amount, minlength=len(keys))
+        return {
+            key: Summary(int(count), float(total))
+            for key, count, total in zip(keys, counts, totals)
+        }
+
+    def to_list(self) -> List[Transaction]:
+        return self.transactions.tolist()
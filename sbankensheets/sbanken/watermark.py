@@ -0,0 +1,96 @@
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from .._state import cache_path, locked, read_json, write_json
+from ..sbanken.transaction import Transaction, filter_transactions
+
+
+class WatermarkStore(object):
+    """
+    Persisted per-account sync watermarks, used to fetch only the transactions
+    booked since the last run.
+
+    A watermark is the latest accounting date synced for an account, together
+    with the ids of the transactions synced within the overlap window before
+    it. The next run starts the overlap window before the watermark, so late
+    bookings are picked up, and drops the transactions it has already seen.
+    """
+
+    def __init__(self, path: str = None, overlap_days: int = 3):
+        """
+        :param path: Path to the watermark file. Defaults to watermarks.json in
+        the sbankensheets cache directory.
+        :param overlap_days: Number of days before the watermark to fetch again.
+        """
+        self.path = path if path else cache_path("watermarks.json")
+        self.overlap_days = overlap_days
+
+    def get(self, account_id: str) -> Optional[Dict]:
+        """
+        :return: The watermark of the account, if any, as a dict with the
+        accounting 'date' and the 'ids' seen within the overlap window, counted.
+        """
+        with locked(self.path):
+            return read_json(self.path, {}).get(account_id)
+
+    def start_date(self, account_id: str, default: str = None) -> Optional[str]:
+        """
+        Get the start date to request transactions from.
+        :param account_id: The account id.
+        :param default: The start date to use if the account has no watermark.
+        :return: An ISO formatted date.
+        """
+        watermark = self.get(account_id)
+        if watermark is None:
+            return default
+
+        return self._window_start(date.fromisoformat(watermark["date"])).isoformat()
+
+    def filter_new(
+        self, account_id: str, transactions: Iterable[Transaction]
+    ) -> List[Transaction]:
+        """
+        Remove transactions already synced within the overlap window. Identical
+        transactions are counted, so only the surplus occurrences are kept.
+        :param account_id: The account id.
+        :param transactions: Transactions fetched from start_date.
+        :return: The transactions not seen before.
+        """
+        watermark = self.get(account_id)
+        if watermark is None:
+            return list(transactions)
+
+        return filter_transactions(transactions, Counter(watermark["ids"]).elements())
+
+    def advance(self, account_id: str, transactions: Iterable[Transaction]):
+        """
+        Move the watermark of an account forward. Should be called once the
+        transactions are synced.
+        :param account_id: The account id.
+        :param transactions: Every transaction fetched from start_date, not only
+        the new ones.
+        """
+        transactions = list(transactions)
+        if not transactions:
+            return
+
+        with locked(self.path):
+            watermarks = read_json(self.path, {})
+            watermark = watermarks.get(account_id)
+
+            latest = max(transaction.accounting_date for transaction in transactions)
+            if watermark is not None:
+                latest = max(latest, date.fromisoformat(watermark["date"]))
+            window_start = self._window_start(latest)
+
+            ids = Counter(
+                transaction.id
+                for transaction in transactions
+                if transaction.accounting_date >= window_start
+            )
+            watermarks[account_id] = {"date": latest.isoformat(), "ids": ids}
+            write_json(self.path, watermarks)
+
+    def _window_start(self, watermark: date) -> date:
+        return watermark - timedelta(days=self.overlap_days)
@@ -0,0 +1,178 @@
+import json
+import os
+import sqlite3
+from collections import Counter
+from typing import Iterable, List, Optional
+
+from .._state import cache_path
+from ..sbanken.transaction import Transaction
+
+
+class TransactionStore(object):
+    """
+    Local SQLite mirror of the Sbanken transaction history.
+
+    Transactions are keyed by account id, content hash and occurrence, the
+    latter numbering identical transactions within an ingested batch. Upserting
+    the same batch twice is therefore idempotent, while identical transactions
+    are still stored once per occurrence.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            account_id TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            occurrence INTEGER NOT NULL,
+            accounting_date TEXT NOT NULL,
+            amount REAL NOT NULL,
+            text TEXT NOT NULL,
+            transaction_type_code INTEGER,
+            category TEXT NOT NULL DEFAULT '',
+            data TEXT NOT NULL,
+            PRIMARY KEY (account_id, content_hash, occurrence)
+        );
+        CREATE INDEX IF NOT EXISTS transactions_account_date
+            ON transactions (account_id, accounting_date);
+        CREATE INDEX IF NOT EXISTS transactions_content_hash
+            ON transactions (content_hash);
+    """
+
+    # Not an upsert clause, which needs SQLite 3.24
+    _insert = """
+        INSERT OR IGNORE INTO transactions (
+            account_id, content_hash, occurrence, accounting_date, amount, text,
+            transaction_type_code, category, data
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    _update_category = """
+        UPDATE transactions SET category = ?
+        WHERE account_id = ? AND content_hash = ? AND occurrence = ?
+    """
+
+    def __init__(self, path: str = None):
+        """
+        :param path: Path to the database. Defaults to transactions.sqlite3 in
+        the sbankensheets cache directory. Use ':memory:' for a temporary store.
+        """
+        self.path = path if path else cache_path("transactions.sqlite3")
+        if self.path != ":memory:" and os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.connection = sqlite3.connect(self.path)
+        with self.connection:
+            self.connection.executescript(self._schema)
+
+    def __enter__(self) -> "TransactionStore":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def upsert(self, account_id: str, transactions: Iterable[Transaction]) -> int:
+        """
+        Insert transactions, or update the category of those already stored.
+        :param account_id: The account the transactions belong to.
+        :param transactions: The transactions to store. Identical transactions
+        are numbered within the batch, so it must hold every transaction of
+        the days it covers, like a fetch does.
+        :return: The number of transactions in the batch.
+        """
+        occurrences = Counter()
+        rows = []
+        for transaction in transactions:
+            content_hash = transaction.content_hash
+            rows.append(
+                (
+                    account_id,
+                    content_hash,
+                    occurrences[content_hash],
+                    transaction.accounting_date.isoformat(),
+                    transaction.amount,
+                    transaction.text,
+                    transaction.transaction_type_code,
+                    transaction.category or "",
+                    json.dumps(transaction._data, ensure_ascii=False),
+                )
+            )
+            occurrences[content_hash] += 1
+
+        with self.connection:
+            self.connection.executemany(self._insert, rows)
+            self.connection.executemany(
+                self._update_category,
+                [(row[7], row[0], row[1], row[2]) for row in rows if row[7]],
+            )
+
+        return len(rows)
+
+    def transactions(
+        self, account_id: str = None, start_date: str = None, end_date: str = None
+    ) -> List[Transaction]:
+        """
+        Get stored transactions, newest first like the Sbanken API.
+        :param account_id: Only return transactions of this account.
+        :param start_date: Only return transactions booked on or after this ISO date.
+        :param end_date: Only return transactions booked on or before this ISO date.
+        :return: A list of Transaction objects.
+        """
+        where, parameters = self._where(account_id, start_date, end_date)
+        rows = self.connection.execute(
+            f"SELECT data, category FROM transactions {where} "
+            "ORDER BY accounting_date DESC, rowid",
+            parameters,
+        )
+
+        result = []
+        for data, category in rows:
+            transaction = Transaction(json.loads(data))
+            transaction.category = category
+            result.append(transaction)
+        return result
+
+    def count(
+        self, account_id: str = None, start_date: str = None, end_date: str = None
+    ) -> int:
+        where, parameters = self._where(account_id, start_date, end_date)
+        (count,) = self.connection.execute(
+            f"SELECT COUNT(*) FROM transactions {where}", parameters
+        ).fetchone()
+        return count
+
+    def occurrences(self, transaction: Transaction, account_id: str = None) -> int:
+        """
+        :return: The number of stored transactions identical to transaction.
+        """
+        where, parameters = self._where(account_id, None, None)
+        where = f"{where} AND" if where else "WHERE"
+        (count,) = self.connection.execute(
+            f"SELECT COUNT(*) FROM transactions {where} content_hash = ?",
+            parameters + [transaction.content_hash],
+        ).fetchone()
+        return count
+
+    def latest_accounting_date(self, account_id: str) -> Optional[str]:
+        (latest,) = self.connection.execute(
+            "SELECT MAX(accounting_date) FROM transactions WHERE account_id = ?",
+            (account_id,),
+        ).fetchone()
+        return latest
+
+    @staticmethod
+    def _where(account_id, start_date, end_date):
+        conditions = []
+        parameters = []
+        if account_id is not None:
+            conditions.append("account_id = ?")
+            parameters.append(account_id)
+        if start_date is not None:
+            conditions.append("accounting_date >= ?")
+            parameters.append(start_date)
+        if end_date is not None:
+            conditions.append("accounting_date <= ?")
+            parameters.append(end_date)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where, parameters
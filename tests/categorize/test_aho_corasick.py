@@ -0,0 +1,25 @@
+import unittest
+
+from sbankensheets.categorize._aho_corasick import AhoCorasick
+
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_find_returns_indices_of_occurring_patterns(self):
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        self.assertEqual({0, 1, 3}, automaton.find("ushers"))
+
+    def test_find_patterns_that_are_suffixes_of_others(self):
+        automaton = AhoCorasick(["rema 1000", "1000", "a 1"])
+        self.assertEqual({0, 1, 2}, automaton.find("*0054 rema 1000 majorstuen"))
+
+    def test_find_no_patterns(self):
+        automaton = AhoCorasick(["kiwi", "rema"])
+        self.assertEqual(set(), automaton.find("spotify"))
+
+    def test_find_matches_substring_search(self):
+        patterns = ["ab", "abc", "bca", "c", "caa", "aab", "bb"]
+        automaton = AhoCorasick(patterns)
+        for text in ["", "a", "abcaab", "bbbca", "cacacaa", "aabbcc"]:
+            with self.subTest(text=text):
+                expected = {i for i, pattern in enumerate(patterns) if pattern in text}
+                self.assertEqual(expected, automaton.find(text))
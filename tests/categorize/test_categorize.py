@@ -3,6 +3,7 @@ import unittest.mock as mock
 
 from sbankensheets.categorize import *
 from sbankensheets.categorize import _categorize_uncertainty
+from sbankensheets.sbanken import Transaction
 
 
 class TestCategorize(unittest.TestCase):
@@ -64,7 +65,7 @@ class TestCategorize(unittest.TestCase):
             mock.MagicMock(),
             mock.MagicMock(),
         )
-        mock_gsheet.get.return_value = {}
+        mock_gsheet.get_batch.return_value = {"valueRanges": [{}, {}, {}]}
         self.assertIsNone(get_categories(mock_gsheet))
 
     @mock.patch("sbankensheets.categorize._categorize.process_category_values")
@@ -79,13 +80,33 @@ class TestCategorize(unittest.TestCase):
         # Expenses, incomes and savings
         mock_find_cells.return_value = [mock.MagicMock() for _ in range(3)]
         # Number of categories
-        mock_gsheet.get.return_value = {"values": [mock.MagicMock() for _ in range(2)]}
+        mock_gsheet.get_batch.return_value = {
+            "valueRanges": [
+                {"values": [mock.MagicMock() for _ in range(2)]} for _ in range(3)
+            ]
+        }
         # Values to be returned from process_category_values
         mock_process.side_effect = range(3 * 2)
 
         actual = get_categories(gsheet=mock_gsheet)
         self.assertEqual(actual, expected)
 
+    @mock.patch("sbankensheets.categorize._categorize.A1Range")
+    @mock.patch("sbankensheets.categorize._categorize.find_cells")
+    @mock.patch("sbankensheets.categorize._categorize.GSheet")
+    def test_get_categories_reads_all_category_ranges_at_once(
+        self, mock_gsheet, mock_find_cells, mock_a1range
+    ):
+        mock_find_cells.return_value = [mock.MagicMock() for _ in range(3)]
+        mock_gsheet.get_batch.return_value = {"valueRanges": [{"values": []}] * 3}
+
+        get_categories(gsheet=mock_gsheet)
+
+        mock_gsheet.get.assert_not_called()
+        mock_gsheet.get_batch.assert_called_once_with(
+            [mock_a1range()] * 3, value_render_option="UNFORMATTED_VALUE"
+        )
+
     def test_categorize_uncertainty_no_amount_action_equal_amount_return_true(self):
         mock_transaction = mock.MagicMock()
         mock_category = mock.MagicMock()
@@ -261,3 +282,172 @@ class TestCategorize(unittest.TestCase):
         )
 
         self.assertEqual(actual, test_name_ordinary)
+
+
+class TestCategorizer(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.categories = [
+            Category("Dagligvare", keywords=["rema", "kiwi", "coop"]),
+            Category("Strøm", 500, "+", keywords=["fjordkraft?"]),
+            Category("Abonnement", 109, keywords=["spotify?", "netflix"]),
+            Category("Annet", keywords=["*"]),
+            Category("Transport", keywords=["ruter", "vy"]),
+        ]
+
+    @staticmethod
+    def make_transaction(text: str, amount: float = -100.0) -> Transaction:
+        return Transaction({"text": text, "amount": amount})
+
+    def test_categorize_matches_categorize_function(self):
+        categorizer = Categorizer(self.categories)
+        transactions = [
+            self.make_transaction("KIWI 505 BARCODE"),
+            self.make_transaction("Fjordkraft AS", -600.0),
+            self.make_transaction("Fjordkraft AS", -400.0),
+            self.make_transaction("*0054 11.08 NOK 109.00 Spotify P0701F7525", -109.0),
+            self.make_transaction("Spotify P0701F7525", -119.0),
+            self.make_transaction("Ruter AS"),
+            self.make_transaction("Ruter AS Rema 1000"),
+            self.make_transaction("Straksoverføring"),
+        ]
+        for transaction in transactions:
+            with self.subTest(text=transaction.text, amount=transaction.amount):
+                self.assertEqual(
+                    categorize(transaction, self.categories),
+                    categorizer.categorize(transaction),
+                )
+
+    def test_categorize_first_category_wins(self):
+        categorizer = Categorizer(self.categories)
+        self.assertEqual(
+            "Dagligvare",
+            categorizer.categorize(self.make_transaction("Ruter AS Rema 1000")),
+        )
+
+    def test_categorize_uncertain_keyword_checks_amount(self):
+        categorizer = Categorizer(self.categories)
+        self.assertEqual(
+            "Strøm", categorizer.categorize(self.make_transaction("Fjordkraft", -600.0))
+        )
+        self.assertEqual(
+            "Annet", categorizer.categorize(self.make_transaction("Fjordkraft", -400.0))
+        )
+
+    def test_categorize_star_is_fallback(self):
+        categorizer = Categorizer(self.categories)
+        self.assertEqual(
+            "Annet", categorizer.categorize(self.make_transaction("Straksoverføring"))
+        )
+
+    def test_categorize_without_star_returns_none(self):
+        categorizer = Categorizer(self.categories[:3])
+        self.assertIsNone(
+            categorizer.categorize(self.make_transaction("Straksoverføring"))
+        )
+
+    def test_categorize_many_matches_categorize(self):
+        categorizer = Categorizer(self.categories)
+        transactions = [
+            self.make_transaction("KIWI 505 BARCODE"),
+            self.make_transaction("Fjordkraft AS", -600.0),
+            self.make_transaction("Fjordkraft AS", -400.0),
+            self.make_transaction("Straksoverføring"),
+        ]
+
+        self.assertEqual(
+            [categorizer.categorize(t) for t in transactions],
+            categorizer.categorize_many(transactions),
+        )
+
+    def test_categorize_many_evaluates_identical_inputs_once(self):
+        categorizer = Categorizer(self.categories)
+        transactions = [self.make_transaction("KIWI 505 BARCODE") for _ in range(3)]
+        transactions.append(self.make_transaction("Ruter AS"))
+
+        with mock.patch.object(
+            categorizer, "_categorize", wraps=categorizer._categorize
+        ) as mock_categorize:
+            categorizer.categorize_many(transactions)
+            categorizer.categorize_many(transactions)
+
+        self.assertEqual(2, mock_categorize.call_count)
+
+    def test_categorize_many_shares_results_not_depending_on_amount(self):
+        categorizer = Categorizer(self.categories)
+        transactions = [
+            self.make_transaction("KIWI 505 BARCODE", -amount) for amount in range(5)
+        ]
+
+        with mock.patch.object(
+            categorizer, "_categorize", wraps=categorizer._categorize
+        ) as mock_categorize:
+            categorizer.categorize_many(transactions)
+
+        self.assertEqual(1, mock_categorize.call_count)
+
+    def test_categorize_many_uncertain_keyword_results_are_keyed_on_amount(self):
+        categorizer = Categorizer(self.categories)
+        transactions = [
+            self.make_transaction("Fjordkraft AS", -600.0),
+            self.make_transaction("Fjordkraft AS", -400.0),
+            self.make_transaction("Fjordkraft AS", -600.0),
+        ]
+
+        with mock.patch.object(
+            categorizer, "_categorize", wraps=categorizer._categorize
+        ) as mock_categorize:
+            actual = categorizer.categorize_many(transactions)
+
+        self.assertEqual(["Strøm", "Annet", "Strøm"], actual)
+        self.assertEqual(2, mock_categorize.call_count)
+
+    def test_categorize_many_memo_is_bounded(self):
+        categorizer = Categorizer(self.categories, memo_size=2)
+        transactions = [self.make_transaction(f"Kiwi {i}") for i in range(3)]
+
+        with mock.patch.object(
+            categorizer, "_categorize", wraps=categorizer._categorize
+        ) as mock_categorize:
+            categorizer.categorize_many(transactions)
+            categorizer.categorize_many(transactions[:1])
+
+        self.assertEqual(4, mock_categorize.call_count)
+
+    def test_categorize_normalized_keeps_names_with_digits(self):
+        transaction = self.make_transaction(
+            "*1234 02.09 NOK 45.20 REMA1000 MAJORSTUEN Kurs: 1.0000"
+        )
+
+        self.assertEqual(
+            "Dagligvare",
+            Categorizer(self.categories, normalize=True).categorize(transaction),
+        )
+
+    def test_categorize_normalized_star_matches_card_purchases(self):
+        transactions = [
+            self.make_transaction("*0054 11.08 NOK 39.00 RUTER AS Kurs: 1.0000"),
+            self.make_transaction("Ruter AS"),
+            self.make_transaction("*0054 11.08 NOK 45.20 REMA1000 Kurs: 1.0000"),
+        ]
+
+        self.assertEqual(
+            [categorize(t, self.categories) for t in transactions],
+            Categorizer(self.categories, normalize=True).categorize_many(transactions),
+        )
+        self.assertEqual("Annet", categorize(transactions[0], self.categories))
+
+    def test_categorize_many_normalized_shares_results_by_merchant(self):
+        categorizer = Categorizer(self.categories, normalize=True)
+        transactions = [
+            self.make_transaction(f"*0054 {day:02d}.08 NOK 45.00 KIWI 505", -45.0)
+            for day in range(1, 10)
+        ]
+
+        with mock.patch.object(
+            categorizer, "_categorize", wraps=categorizer._categorize
+        ) as mock_categorize:
+            actual = categorizer.categorize_many(transactions)
+
+        self.assertEqual(["Dagligvare"] * len(transactions), actual)
+        self.assertEqual(1, mock_categorize.call_count)
@@ -0,0 +1,74 @@
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.categorize import Category, CategoryCache
+
+
+class TestCategoryCache(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = CategoryCache(os.path.join(self.directory.name, "categories.json"))
+        self.categories = {
+            "expenses": [
+                Category("Dagligvare", keywords=["rema", "kiwi"]),
+                Category("Strøm", 500, "+", keywords=["fjordkraft?"]),
+            ],
+            "income": [Category("Lønn", keywords=["lønn"])],
+            "savings": [],
+        }
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+        mock.patch.stopall()
+
+    def test_get_returns_put_categories(self):
+        self.cache.put("spreadsheet-id", "10", self.categories)
+
+        self.assertEqual(self.categories, self.cache.get("spreadsheet-id", "10"))
+
+    def test_get_other_revision_returns_none(self):
+        self.cache.put("spreadsheet-id", "10", self.categories)
+
+        self.assertIsNone(self.cache.get("spreadsheet-id", "11"))
+        self.assertIsNone(self.cache.get("other-spreadsheet-id", "10"))
+
+    def test_renew_moves_categories_to_new_revision(self):
+        self.cache.put("spreadsheet-id", "10", self.categories)
+
+        self.assertTrue(self.cache.renew("spreadsheet-id", "10", "12"))
+        self.assertEqual(self.categories, self.cache.get("spreadsheet-id", "12"))
+        self.assertIsNone(self.cache.get("spreadsheet-id", "10"))
+
+    def test_renew_stale_revision_does_nothing(self):
+        self.cache.put("spreadsheet-id", "10", self.categories)
+
+        self.assertFalse(self.cache.renew("spreadsheet-id", "11", "12"))
+        self.assertIsNone(self.cache.get("spreadsheet-id", "12"))
+
+    @mock.patch("sbankensheets.categorize.category_cache.get_categories")
+    def test_fetch_reads_categories_once_per_revision(self, mock_get_categories):
+        mock_get_categories.return_value = self.categories
+        gsheet = mock.MagicMock()
+        gsheet.spreadsheet_id = "spreadsheet-id"
+        gsheet.revision.return_value = "10"
+
+        self.assertEqual(self.categories, self.cache.fetch(gsheet))
+        self.assertEqual(self.categories, self.cache.fetch(gsheet))
+        mock_get_categories.assert_called_once_with(gsheet, None)
+
+        gsheet.revision.return_value = "11"
+        self.cache.fetch(gsheet)
+        self.assertEqual(2, mock_get_categories.call_count)
+
+    @mock.patch("sbankensheets.categorize.category_cache.get_categories")
+    def test_fetch_does_not_cache_failures(self, mock_get_categories):
+        mock_get_categories.return_value = None
+        gsheet = mock.MagicMock()
+        gsheet.spreadsheet_id = "spreadsheet-id"
+
+        self.assertIsNone(self.cache.fetch(gsheet, "10"))
+        self.assertIsNone(self.cache.get("spreadsheet-id", "10"))
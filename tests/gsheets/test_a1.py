@@ -174,3 +174,13 @@ class TestA1Range(unittest.TestCase):
     def test_get_1_idx(self):
         actual = self.range_b5_c6[1]
         self.assertEqual(actual, self.cell_c6)
+
+    def test_bounds(self):
+        self.assertEqual((1, 4, 2, 5), self.range_b5_c6.bounds())
+
+    def test_bounds_all_rows(self):
+        self.assertEqual((1, 4, 1, None), self.range_b5_b.bounds())
+        self.assertEqual((1, 4, 3, None), A1Range(self.cell_b5, "D").bounds())
+
+    def test_bounds_entire_sheet(self):
+        self.assertIsNone(A1Range(sheet="My Sheet").bounds())
@@ -0,0 +1,90 @@
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.gsheets import A1Cell, A1Range, AnchorLocator
+
+
+class TestAnchorLocator(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.find_cells = mock.patch(
+            "sbankensheets.gsheets.anchor_locator.find_cells"
+        ).start()
+        self.find_cells.return_value = [A1Cell("B3"), A1Cell("H3")]
+        self.gsheet = mock.MagicMock()
+        self.gsheet.named_ranges.return_value = {}
+        self.locator = AnchorLocator(self.gsheet)
+
+    def tearDown(self):
+        super().tearDown()
+        mock.patch.stopall()
+
+    def named(self, *cells):
+        return {
+            f"sbankensheets_August_Transaksjoner_Dato_{i}": A1Range(
+                A1Cell(cell), A1Cell(cell), sheet="August Transaksjoner"
+            )
+            for i, cell in enumerate(cells)
+        }
+
+    def test_unnamed_header_is_scanned_and_named(self):
+        cells = self.locator.find_cells("August Transaksjoner", "Dato")
+
+        self.assertEqual([A1Cell("B3"), A1Cell("H3")], cells)
+        self.find_cells.assert_called_once_with(
+            self.gsheet, "August Transaksjoner", "Dato", None
+        )
+        self.gsheet.set_named_ranges.assert_called_once_with(
+            self.named("B3", "H3"), remove=[]
+        )
+
+    def test_named_header_is_not_scanned(self):
+        self.gsheet.named_ranges.return_value = self.named("C4", "I4")
+        self.gsheet.get_batch.return_value = {
+            "valueRanges": [{"values": [["Dato"]]}, {"values": [["Dato"]]}]
+        }
+
+        cells = self.locator.find_cells("August Transaksjoner", "Dato")
+
+        self.assertEqual([A1Cell("C4"), A1Cell("I4")], cells)
+        self.gsheet.get_batch.assert_called_once_with(
+            list(self.named("C4", "I4").values()), value_render_option=None
+        )
+        self.find_cells.assert_not_called()
+        self.gsheet.set_named_ranges.assert_not_called()
+
+    def test_moved_header_is_scanned_and_renamed(self):
+        self.gsheet.named_ranges.return_value = self.named("C4", "I4", "O4")
+        self.gsheet.get_batch.return_value = {
+            "valueRanges": [{"values": [["Dato"]]}, {}, {"values": [["Dato"]]}]
+        }
+
+        cells = self.locator.find_cells("August Transaksjoner", "Dato")
+
+        self.assertEqual([A1Cell("B3"), A1Cell("H3")], cells)
+        self.gsheet.set_named_ranges.assert_called_once_with(
+            self.named("B3", "H3"),
+            remove=["sbankensheets_August_Transaksjoner_Dato_2"],
+        )
+
+    def test_registered_header_is_found_without_scanning_again(self):
+        self.locator.find_cells("August Transaksjoner", "Dato")
+        self.gsheet.get_batch.return_value = {
+            "valueRanges": [{"values": [["Dato"]]}, {"values": [["Dato"]]}]
+        }
+
+        cells = self.locator.find_cells("August Transaksjoner", "Dato")
+
+        self.assertEqual([A1Cell("B3"), A1Cell("H3")], cells)
+        self.find_cells.assert_called_once()
+        self.gsheet.named_ranges.assert_called_once()
+
+    def test_header_not_found_returns_none(self):
+        self.find_cells.return_value = None
+
+        self.assertIsNone(self.locator.find_cells("August Transaksjoner", "Dato"))
+        self.gsheet.set_named_ranges.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
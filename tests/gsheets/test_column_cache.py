@@ -0,0 +1,97 @@
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.gsheets import A1Cell, A1Range, ColumnCache
+
+
+class FakeSheet(object):
+    def __init__(self, column):
+        self.spreadsheet_id = "spreadsheet-id"
+        self.column = column
+        self.ranges = []
+
+    def get(self, range):
+        self.ranges.append(str(range))
+        _, start_row, _, _ = range.bounds()
+        values = self.column[start_row:]
+        return {"values": values} if values else {}
+
+
+class TestColumnCache(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ColumnCache(
+            os.path.join(self.directory.name, "columns.json"), overlap=2
+        )
+        self.range = A1Range(A1Cell("B3"), sheet="Sheet")
+        self.sheet = FakeSheet([["header"], ["x"], ["a"], ["b"], ["c"], ["d"]])
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+        mock.patch.stopall()
+
+    def test_first_read_is_full(self):
+        values = self.cache.get(self.sheet, self.range)
+
+        self.assertEqual([["a"], ["b"], ["c"], ["d"]], values)
+        self.assertEqual(["'Sheet'!B3:B"], self.sheet.ranges)
+
+    def test_second_read_is_tail_only(self):
+        self.cache.get(self.sheet, self.range)
+        self.sheet.column += [["e"], ["f"]]
+        self.sheet.ranges = []
+
+        values = self.cache.get(self.sheet, self.range)
+
+        self.assertEqual([["a"], ["b"], ["c"], ["d"], ["e"], ["f"]], values)
+        self.assertEqual(["'Sheet'!B5:B"], self.sheet.ranges)
+
+    def test_unchanged_column_reads_overlap_only(self):
+        self.cache.get(self.sheet, self.range)
+        self.sheet.ranges = []
+
+        values = self.cache.get(self.sheet, self.range)
+
+        self.assertEqual([["a"], ["b"], ["c"], ["d"]], values)
+        self.assertEqual(["'Sheet'!B5:B"], self.sheet.ranges)
+
+    def test_edited_overlap_falls_back_to_full_read(self):
+        self.cache.get(self.sheet, self.range)
+        self.sheet.column.insert(3, ["inserted"])
+        self.sheet.ranges = []
+
+        values = self.cache.get(self.sheet, self.range)
+
+        self.assertEqual([["a"], ["inserted"], ["b"], ["c"], ["d"]], values)
+        self.assertEqual(["'Sheet'!B5:B", "'Sheet'!B3:B"], self.sheet.ranges)
+
+    def test_shrunk_column_falls_back_to_full_read(self):
+        self.cache.get(self.sheet, self.range)
+        del self.sheet.column[-1]
+        self.sheet.ranges = []
+
+        values = self.cache.get(self.sheet, self.range)
+
+        self.assertEqual([["a"], ["b"], ["c"]], values)
+        self.assertEqual(["'Sheet'!B5:B", "'Sheet'!B3:B"], self.sheet.ranges)
+
+    def test_empty_column_is_cached(self):
+        self.sheet.column = [["header"], ["x"]]
+        self.assertEqual([], self.cache.get(self.sheet, self.range))
+        self.sheet.column += [["a"]]
+        self.sheet.ranges = []
+
+        self.assertEqual([["a"]], self.cache.get(self.sheet, self.range))
+        self.assertEqual(["'Sheet'!B3:B"], self.sheet.ranges)
+
+    def test_bounded_range_raises(self):
+        with self.assertRaises(ValueError):
+            self.cache.get(self.sheet, A1Range.from_str("B3", "B10", sheet="Sheet"))
+
+
+if __name__ == "__main__":
+    unittest.main()
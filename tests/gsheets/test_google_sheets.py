@@ -1,6 +1,8 @@
 import unittest
 import unittest.mock as mock
 
+from googleapiclient.errors import HttpError
+
 from sbankensheets.gsheets import GSheet, A1Cell, A1Range
 
 
@@ -61,7 +63,10 @@ class TestGSheet(unittest.TestCase):
         self.gsheets.get_batch(ranges)
 
         self.gsheets.service.spreadsheets().values().batchGet.assert_called_once_with(
-            ranges=ranges, spreadsheetId=self.gsheets.spreadsheet_id
+            ranges=ranges,
+            spreadsheetId=self.gsheets.spreadsheet_id,
+            valueRenderOption=None,
+            dateTimeRenderOption=None,
         )
 
     def test_get_batch_calls_service_getBatch_execute_one(self):
@@ -69,3 +74,269 @@ class TestGSheet(unittest.TestCase):
         self.gsheets.get_batch(ranges)
 
         self.gsheets.service.spreadsheets().values().batchGet().execute.assert_called_once()
+
+    def test_revision_gets_drive_file_version(self):
+        files = self.gsheets.drive_service.files()
+        files.get().execute.return_value = {"version": "42"}
+
+        self.assertEqual("42", self.gsheets.revision())
+        files.get.assert_called_with(
+            fileId=self.gsheets.spreadsheet_id, fields="version"
+        )
+
+    def test_batch_update_calls_service_batchUpdate_with_correct_args(self):
+        expenses = A1Range.from_str("B10", "F11", sheet="August")
+        income = A1Range.from_str("H5", "L5", sheet="September")
+        expenses_values = [["id1", "2018-08-01"], ["id2", "2018-08-02"]]
+        income_values = [["id3", "2018-09-01"]]
+
+        self.gsheets.batch_update(
+            [(expenses, expenses_values), (income, income_values)]
+        )
+
+        self.gsheets.service.spreadsheets().values().batchUpdate.assert_called_once_with(
+            spreadsheetId=self.gsheets.spreadsheet_id,
+            body={
+                "valueInputOption": "USER_ENTERED",
+                "data": [
+                    {"range": "'August'!B10:F11", "values": expenses_values},
+                    {"range": "'September'!H5:L5", "values": income_values},
+                ],
+            },
+        )
+
+    def test_batch_update_calls_service_batchUpdate_execute_once(self):
+        self.gsheets.batch_update([(A1Range.from_str("A1:B2"), [["a", "b"]])])
+
+        self.gsheets.service.spreadsheets().values().batchUpdate().execute.assert_called_once()
+
+    def test_batch_update_beyond_grid_appends_rows_and_retries(self):
+        spreadsheets = self.gsheets.service.spreadsheets()
+        execute = spreadsheets.values().batchUpdate().execute
+        execute.side_effect = [
+            HttpError(
+                mock.Mock(status=400, reason="Bad Request"),
+                b"Range ('August'!H11:L14) exceeds grid limits. Max rows: 10",
+            ),
+            {"responses": []},
+        ]
+        spreadsheets.get().execute.return_value = {
+            "sheets": [
+                {
+                    "properties": {
+                        "sheetId": 3,
+                        "title": "August",
+                        "gridProperties": {"rowCount": 10},
+                    }
+                },
+                {
+                    "properties": {
+                        "sheetId": 4,
+                        "title": "September",
+                        "gridProperties": {"rowCount": 10},
+                    }
+                },
+            ]
+        }
+
+        actual = self.gsheets.batch_update(
+            [
+                (A1Range.from_str("B10", "F12", sheet="August"), [["a"]] * 3),
+                (A1Range.from_str("H11", "L14", sheet="August"), [["b"]] * 4),
+                (A1Range.from_str("B5", "F6", sheet="September"), [["c"]] * 2),
+            ]
+        )
+
+        self.assertEqual({"responses": []}, actual)
+        self.assertEqual(2, execute.call_count)
+        spreadsheets.batchUpdate.assert_called_once_with(
+            spreadsheetId=self.gsheets.spreadsheet_id,
+            body={
+                "requests": [
+                    {
+                        "appendDimension": {
+                            "sheetId": 3,
+                            "dimension": "ROWS",
+                            "length": 4,
+                        }
+                    }
+                ]
+            },
+        )
+
+    def test_batch_update_within_grid_makes_one_request(self):
+        spreadsheets = self.gsheets.service.spreadsheets()
+        spreadsheets.reset_mock()
+
+        self.gsheets.batch_update(
+            [(A1Range.from_str("B10", "F12", sheet="August"), [["a"]] * 3)]
+        )
+
+        spreadsheets.get.assert_not_called()
+        spreadsheets.batchUpdate.assert_not_called()
+        spreadsheets.values().batchUpdate().execute.assert_called_once()
+
+    def test_batch_update_other_error_raises(self):
+        spreadsheets = self.gsheets.service.spreadsheets()
+        spreadsheets.values().batchUpdate().execute.side_effect = HttpError(
+            mock.Mock(status=400, reason="Bad Request"), b"Unable to parse range"
+        )
+
+        with self.assertRaises(HttpError):
+            self.gsheets.batch_update(
+                [(A1Range.from_str("B10", "F12", sheet="August"), [["a"]] * 3)]
+            )
+        spreadsheets.batchUpdate.assert_not_called()
+
+    def test_named_ranges_converts_grid_ranges(self):
+        self.gsheets.service.spreadsheets().get().execute.return_value = {
+            "sheets": [
+                {"properties": {"title": "August"}},
+                {"properties": {"sheetId": 7, "title": "Kategorier"}},
+            ],
+            "namedRanges": [
+                {
+                    "namedRangeId": "a",
+                    "name": "dato_0",
+                    "range": {
+                        "startRowIndex": 2,
+                        "endRowIndex": 3,
+                        "startColumnIndex": 1,
+                        "endColumnIndex": 2,
+                    },
+                },
+                {
+                    "namedRangeId": "b",
+                    "name": "kategori",
+                    "range": {"sheetId": 7, "endColumnIndex": 3},
+                },
+            ],
+        }
+
+        self.assertEqual(
+            {
+                "dato_0": A1Range(A1Cell("B3"), A1Cell("B3"), sheet="August"),
+                "kategori": A1Range(A1Cell("A1"), "C", sheet="Kategorier"),
+            },
+            self.gsheets.named_ranges(),
+        )
+
+    def test_set_named_ranges_replaces_ranges_with_same_name(self):
+        spreadsheets = self.gsheets.service.spreadsheets()
+        spreadsheets.get().execute.return_value = {
+            "sheets": [{"properties": {"sheetId": 7, "title": "August"}}],
+            "namedRanges": [
+                {"namedRangeId": "a", "name": "dato_0", "range": {"sheetId": 7}},
+                {"namedRangeId": "b", "name": "dato_1", "range": {"sheetId": 7}},
+                {"namedRangeId": "c", "name": "other", "range": {"sheetId": 7}},
+            ],
+        }
+
+        self.gsheets.set_named_ranges(
+            {"dato_0": A1Range(A1Cell("B3"), A1Cell("B3"), sheet="August")},
+            remove=["dato_1"],
+        )
+
+        spreadsheets.batchUpdate.assert_called_once_with(
+            spreadsheetId=self.gsheets.spreadsheet_id,
+            body={
+                "requests": [
+                    {"deleteNamedRange": {"namedRangeId": "a"}},
+                    {"deleteNamedRange": {"namedRangeId": "b"}},
+                    {
+                        "addNamedRange": {
+                            "namedRange": {
+                                "name": "dato_0",
+                                "range": {
+                                    "sheetId": 7,
+                                    "startColumnIndex": 1,
+                                    "endColumnIndex": 2,
+                                    "startRowIndex": 2,
+                                    "endRowIndex": 3,
+                                },
+                            }
+                        }
+                    },
+                ]
+            },
+        )
+
+
+class TestGSheetSnapshots(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        mock.patch("sbankensheets.gsheets.google_sheets.build").start()
+        mock.patch("sbankensheets.gsheets.google_sheets.Http").start()
+        mock.patch("sbankensheets.gsheets.google_sheets.file").start()
+        mock.patch("sbankensheets.gsheets.google_sheets.client").start()
+        mock.patch("sbankensheets.gsheets.google_sheets.tools").start()
+
+        self.gsheets = GSheet("some-id", use_snapshots=True)
+        self.values_get = self.gsheets.service.spreadsheets().values().get
+        self.values_get.return_value.execute.return_value = {
+            "values": [
+                ["", "Id", "Dato", "Beløp"],
+                [],
+                ["", "id1", "2018-08-01", "10", "", "x"],
+                ["", ".", "2018-08-02"],
+            ]
+        }
+
+    def tearDown(self):
+        super().tearDown()
+        mock.patch.stopall()
+
+    def test_get_reads_sheet_once(self):
+        self.gsheets.get(A1Range(sheet="August"))
+        self.gsheets.get(A1Range(A1Cell("B3"), sheet="August"))
+        self.gsheets.get_batch(
+            [A1Range(A1Cell("C1"), A1Cell("D4"), sheet="August")] * 2
+        )
+
+        self.values_get.assert_called_once_with(
+            spreadsheetId="some-id",
+            range="'August'",
+            valueRenderOption=None,
+            dateTimeRenderOption=None,
+        )
+
+    def test_get_returns_values_of_range(self):
+        actual = self.gsheets.get(A1Range(A1Cell("B3"), sheet="August"))
+
+        self.assertEqual([["id1"], ["."]], actual["values"])
+
+    def test_get_trims_empty_cells_and_rows(self):
+        actual = self.gsheets.get(A1Range(A1Cell("B2"), "E", sheet="August"))
+
+        self.assertEqual(
+            [[], ["id1", "2018-08-01", "10"], [".", "2018-08-02"]], actual["values"]
+        )
+
+    def test_get_empty_range_has_no_values(self):
+        actual = self.gsheets.get(A1Range(A1Cell("H1"), sheet="August"))
+
+        self.assertNotIn("values", actual)
+
+    def test_get_other_render_option_reads_sheet_again(self):
+        self.gsheets.get(A1Range(sheet="August"))
+        self.gsheets.get(A1Range(sheet="August"), value_render_option="FORMULA")
+
+        self.assertEqual(2, self.values_get.call_count)
+
+    def test_write_invalidates_sheet(self):
+        self.gsheets.get(A1Range(sheet="August"))
+        self.gsheets.batch_update(
+            [(A1Range(A1Cell("B5"), A1Cell("F5"), sheet="August"), [["id2"]])]
+        )
+        self.gsheets.get(A1Range(sheet="August"))
+
+        self.assertEqual(2, self.values_get.call_count)
+
+    def test_invalidate(self):
+        self.gsheets.get(A1Range(sheet="August"))
+        self.gsheets.get(A1Range(sheet="Kategorier"))
+        self.gsheets.invalidate("Kategorier")
+        self.gsheets.get(A1Range(sheet="August"))
+        self.gsheets.get(A1Range(sheet="Kategorier"))
+
+        self.assertEqual(3, self.values_get.call_count)
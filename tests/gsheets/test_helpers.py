@@ -24,7 +24,9 @@ class TestHelpers(unittest.TestCase):
 
         find_cells(mock_gsheet, mock_sheet, mock.Mock())
 
-        mock_gsheet.get.assert_called_once_with(mock_a1range(sheet=mock_sheet))
+        mock_gsheet.get.assert_called_once_with(
+            mock_a1range(sheet=mock_sheet), value_render_option=None
+        )
 
     @mock.patch("sbankensheets.gsheets._helpers.A1Cell")
     @mock.patch("sbankensheets.gsheets._helpers.A1Range")
@@ -0,0 +1,63 @@
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.sbanken.account_index import AccountIndex
+
+
+class TestAccountIndex(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.accounts = [
+            {"accountId": "1", "name": "Brukskonto", "ownerCustomerId": "a"},
+            {"accountId": "2", "name": "Brukskonto", "ownerCustomerId": "b"},
+            {"accountId": "3", "name": "Sparekonto", "ownerCustomerId": "a"},
+        ]
+        self.index = AccountIndex(ttl=60)
+
+    def test_new_index_is_stale(self):
+        self.assertTrue(self.index.is_stale())
+
+    def test_update_makes_index_fresh(self):
+        self.index.update(self.accounts)
+
+        self.assertFalse(self.index.is_stale())
+
+    @mock.patch("sbankensheets.sbanken.account_index.time")
+    def test_index_is_stale_after_ttl(self, mock_time):
+        mock_time.monotonic.return_value = 100
+        self.index.update(self.accounts)
+
+        mock_time.monotonic.return_value = 160
+
+        self.assertTrue(self.index.is_stale())
+
+    def test_invalidate_makes_index_stale(self):
+        self.index.update(self.accounts)
+
+        self.index.invalidate()
+
+        self.assertTrue(self.index.is_stale())
+        self.assertEqual([], self.index.accounts)
+
+    def test_by_name_returns_account_of_owner(self):
+        self.index.update(self.accounts)
+
+        self.assertEqual(self.accounts[1], self.index.by_name("Brukskonto", "b"))
+
+    def test_by_name_missing_returns_none(self):
+        self.index.update(self.accounts)
+
+        self.assertIsNone(self.index.by_name("Sparekonto", "b"))
+
+    def test_by_id_returns_account(self):
+        self.index.update(self.accounts)
+
+        self.assertEqual(self.accounts[2], self.index.by_id("3"))
+
+    def test_update_replaces_lookups(self):
+        self.index.update(self.accounts)
+        self.index.by_id("3")
+
+        self.index.update(self.accounts[:1])
+
+        self.assertIsNone(self.index.by_id("3"))
@@ -0,0 +1,150 @@
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.sbanken import AsyncSbankenSession, SbankenError
+
+
+class TestAsyncSbanken(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.aiohttp = mock.patch(
+            "sbankensheets.sbanken.async_sbanken_session.aiohttp"
+        ).start()
+        mock.patch(
+            "sbankensheets.sbanken.async_sbanken_session.environ",
+            {
+                "CLIENT_ID": "test-client-id",
+                "CLIENT_SECRET": "test-client-secret",
+                "CUSTOMER_ID": "test-customer-id",
+            },
+        ).start()
+        self.Transaction = mock.patch(
+            "sbankensheets.sbanken.sbanken_session.Transaction"
+        ).start()
+        self.Transaction.side_effect = lambda x: x
+
+        self.session = self.aiohttp.ClientSession.return_value
+        self.session.close = mock.AsyncMock()
+        self.responses = []
+        self.session.get.side_effect = self._response
+        self.session.post.side_effect = lambda *args, **kwargs: self._context(
+            {"access_token": "test-token"}
+        )
+
+        self.sbanken = AsyncSbankenSession()
+        await self.sbanken.open()
+
+    async def asyncTearDown(self):
+        await self.sbanken.close()
+        mock.patch.stopall()
+        await super().asyncTearDown()
+
+    def _context(self, json):
+        response = mock.MagicMock()
+        response.json = mock.AsyncMock(return_value=json)
+        context = mock.MagicMock()
+        context.__aenter__.return_value = response
+        return context
+
+    def _response(self, *args, **kwargs):
+        return self._context(self.responses.pop(0))
+
+    async def test_requests_send_authorization_header(self):
+        self.responses = [{"items": [], "isError": False}]
+
+        await self.sbanken.get_accounts()
+
+        self.assertEqual(
+            "Bearer test-token",
+            self.session.get.call_args[1]["headers"]["Authorization"],
+        )
+        self.session.headers.__setitem__.assert_not_called()
+
+    async def test_get_accounts_calls_get_with_correct_args(self):
+        self.responses = [{"items": [], "isError": False}]
+
+        await self.sbanken.get_accounts()
+
+        self.session.get.assert_called_once_with(
+            "https://api.sbanken.no/bank/api/v1/Accounts",
+            headers={
+                "Authorization": "Bearer test-token",
+                "customerId": self.sbanken.customer_id,
+            },
+            params=None,
+        )
+
+    async def test_get_accounts_with_customer_id_uses_customer_id_header(self):
+        self.responses = [{"items": [], "isError": False}]
+
+        await self.sbanken.get_accounts("other-customer-id")
+
+        self.assertEqual(
+            "other-customer-id",
+            self.session.get.call_args[1]["headers"]["customerId"],
+        )
+
+    async def test_get_accounts_response_is_error_raise_sbanken_error(self):
+        self.responses = [{"isError": True, "errorType": None, "errorMessage": None}]
+
+        with self.assertRaises(SbankenError):
+            await self.sbanken.get_accounts()
+
+    async def test_get_account_returns_correct_account(self):
+        items = [
+            {"name": "correct-name", "ownerCustomerId": "wrong-customer-id"},
+            {"name": "correct-name", "ownerCustomerId": self.sbanken.customer_id},
+        ]
+        self.responses = [{"items": items, "isError": False}]
+
+        actual = await self.sbanken.get_account("correct-name")
+
+        self.assertEqual(items[1], actual)
+
+    async def test_get_accounts_is_cached_per_customer(self):
+        self.responses = [
+            {"items": [], "isError": False},
+            {"items": [], "isError": False},
+        ]
+
+        await self.sbanken.get_accounts()
+        await self.sbanken.get_account("test-account-name")
+        await self.sbanken.get_accounts("other-customer-id")
+
+        self.assertEqual(2, self.session.get.call_count)
+
+    async def test_get_transactions_drops_empty_queries(self):
+        self.responses = [{"items": [], "isError": False}]
+
+        await self.sbanken.get_transactions("test-account-id", start_date="2018-01-01")
+
+        self.assertEqual(
+            {"index": "0", "length": "100", "startDate": "2018-01-01"},
+            self.session.get.call_args[1]["params"],
+        )
+
+    async def test_get_all_transactions_returns_pages_in_order(self):
+        self.responses = [
+            {"items": [{"n": 1}, {"n": 2}], "availableItems": 3, "isError": False},
+            {"items": [{"n": 3}], "availableItems": 3, "isError": False},
+        ]
+        self.sbanken._remove_unbooked_transactions = list
+
+        actual = await self.sbanken.get_all_transactions("test-account-id", page_size=2)
+
+        self.assertEqual([{"n": 1}, {"n": 2}, {"n": 3}], actual)
+
+    async def test_get_transactions_for_accounts_keys_by_account_id(self):
+        self.responses = [
+            {"items": [{"n": 1}], "isError": False},
+            {"items": [{"n": 2}], "isError": False},
+        ]
+        self.sbanken._remove_unbooked_transactions = list
+        accounts = [
+            {"accountId": "first", "ownerCustomerId": "customer-1"},
+            {"accountId": "second", "ownerCustomerId": "customer-2"},
+        ]
+
+        actual = await self.sbanken.get_transactions_for_accounts(accounts)
+
+        self.assertEqual({"first": [{"n": 1}], "second": [{"n": 2}]}, actual)
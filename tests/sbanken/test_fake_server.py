@@ -0,0 +1,195 @@
+import asyncio
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from datetime import date
+
+from sbankensheets.sbanken import (
+    AsyncSbankenSession,
+    RequestScheduler,
+    SbankenError,
+    SbankenSession,
+    TokenCache,
+)
+from sbankensheets.sbanken.fake_server import FakeSbankenServer, generate_transactions
+
+
+class TestFakeServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeSbankenServer(
+            accounts=2, transactions_per_account=250, end_date=date(2018, 12, 31)
+        )
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.server.stop()
+
+    def setUp(self):
+        super().setUp()
+        mock.patch.dict(
+            os.environ,
+            {
+                "CLIENT_ID": "test-client-id",
+                "CLIENT_SECRET": "test-client-secret",
+                "CUSTOMER_ID": self.server.customer_id,
+                "OAUTHLIB_INSECURE_TRANSPORT": "1",
+            },
+        ).start()
+        self.sbanken = SbankenSession(
+            api_url=self.server.api_url, token_url=self.server.token_url
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.sbanken.close()
+        self.server.error_rate = 0.0
+        mock.patch.stopall()
+
+    def test_generate_transactions_is_seeded(self):
+        self.assertEqual(generate_transactions(10, 3), generate_transactions(10, 3))
+
+    def test_get_account_by_name(self):
+        account = self.sbanken.get_account("Brukskonto")
+
+        self.assertEqual(self.server.accounts[0], account)
+
+    def test_get_all_transactions_paginates_through_date_range(self):
+        account_id = self.server.accounts[0]["accountId"]
+
+        transactions = self.sbanken.get_all_transactions(
+            account_id, start_date="2018-01-01", end_date="2018-12-31", page_size=40
+        )
+
+        self.assertEqual(250, len(transactions))
+        dates = [t.accounting_date for t in transactions]
+        self.assertEqual(sorted(dates, reverse=True), dates)
+
+    def test_iter_all_transactions_matches_get_all_transactions(self):
+        account_id = self.server.accounts[1]["accountId"]
+        kwargs = dict(start_date="2018-06-01", end_date="2018-12-31", page_size=40)
+
+        streamed = self.sbanken.iter_all_transactions(account_id, **kwargs)
+        fetched = self.sbanken.get_all_transactions(account_id, **kwargs)
+
+        self.assertEqual([t._data for t in fetched], [t._data for t in streamed])
+
+    def test_backfill_transactions_matches_get_all_transactions(self):
+        account_id = self.server.accounts[0]["accountId"]
+
+        backfilled = self.sbanken.backfill_transactions(
+            account_id, "2018-01-01", "2018-12-31"
+        )
+        fetched = self.sbanken.get_all_transactions(
+            account_id, start_date="2018-01-01", end_date="2018-12-31"
+        )
+
+        self.assertEqual([t._data for t in fetched], [t._data for t in backfilled])
+
+    def test_scheduler_retries_transient_errors(self):
+        self.server.error_rate = 0.5
+        self.sbanken.scheduler = RequestScheduler(
+            rate=1000, burst=1000, max_retries=20, backoff_base=0.001
+        )
+        account_id = self.server.accounts[0]["accountId"]
+
+        transactions = self.sbanken.get_all_transactions(
+            account_id, start_date="2018-01-01", end_date="2018-12-31", page_size=25
+        )
+
+        self.assertEqual(250, len(transactions))
+        self.assertGreater(self.sbanken.scheduler.stats.retried, 0)
+
+    def test_scheduler_raises_once_retries_are_exhausted(self):
+        self.server.error_rate = 1.0
+        self.sbanken.scheduler = RequestScheduler(
+            rate=1000, burst=1000, max_retries=2, backoff_base=0.001
+        )
+
+        with self.assertRaises(SbankenError):
+            self.sbanken.get_accounts()
+
+
+class TestAsyncFakeServer(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = FakeSbankenServer(accounts=1, transactions_per_account=10)
+        cls.server.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.server.stop()
+
+    async def asyncSetUp(self):
+        await super().asyncSetUp()
+        self.directory = tempfile.TemporaryDirectory()
+        mock.patch.dict(
+            os.environ,
+            {
+                "CLIENT_ID": "test-client-id",
+                "CLIENT_SECRET": "test-client-secret",
+                "CUSTOMER_ID": self.server.customer_id,
+            },
+        ).start()
+
+    async def asyncTearDown(self):
+        mock.patch.stopall()
+        self.directory.cleanup()
+        await super().asyncTearDown()
+
+    def token_cache(self, refresh_margin: float = 60) -> TokenCache:
+        return TokenCache(
+            os.path.join(self.directory.name, "tokens.json"),
+            refresh_margin=refresh_margin,
+        )
+
+    def session(self, token_cache: TokenCache) -> AsyncSbankenSession:
+        return AsyncSbankenSession(
+            token_cache=token_cache,
+            api_url=self.server.api_url,
+            token_url=self.server.token_url,
+        )
+
+    async def test_token_is_refreshed_in_background(self):
+        # Tokens last 3600 seconds, so this refreshes every 0.1 seconds
+        token_cache = self.token_cache(refresh_margin=3599.9)
+        requests = self.server.token_requests
+
+        async with self.session(token_cache) as sbanken:
+            await asyncio.sleep(0.35)
+
+            self.assertFalse(sbanken._refresh_task.done())
+            self.assertGreaterEqual(self.server.token_requests - requests, 3)
+            account = await sbanken.get_account("Brukskonto")
+
+        self.assertEqual(self.server.accounts[0], account)
+
+    async def test_scheduler_raises_once_retries_are_exhausted(self):
+        sbanken = self.session(self.token_cache())
+        sbanken.scheduler = RequestScheduler(
+            rate=1000, burst=1000, max_retries=2, backoff_base=0.001
+        )
+
+        async with sbanken:
+            self.server.error_rate = 1.0
+            try:
+                with self.assertRaises(SbankenError):
+                    await sbanken.get_accounts()
+            finally:
+                self.server.error_rate = 0.0
+
+    async def test_concurrent_sessions_share_one_token(self):
+        token_cache = self.token_cache()
+        requests = self.server.token_requests
+        sessions = [self.session(token_cache) for _ in range(4)]
+
+        await asyncio.gather(*(sbanken.open() for sbanken in sessions))
+        await asyncio.gather(*(sbanken.close() for sbanken in sessions))
+
+        self.assertEqual(1, self.server.token_requests - requests)
@@ -0,0 +1,76 @@
+import json
+import unittest
+
+from sbankensheets.sbanken._json_stream import iter_json_array
+
+
+def chunked(document: str, size: int):
+    encoded = document.encode("utf-8")
+    return [encoded[i : i + size] for i in range(0, len(encoded), size)]
+
+
+class TestJsonStream(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.document = {
+            "availableItems": 3,
+            "items": [
+                {"amount": -1234.5, "text": "Varekjøp ÆØÅ", "nested": {"a": [1, 2]}},
+                {"amount": 10, "text": "Straksoverføring"},
+                {"amount": 100000, "text": "Lønn"},
+            ],
+            "errorType": None,
+            "isError": False,
+        }
+
+    def test_yields_array_elements_for_every_chunk_size(self):
+        document = json.dumps(self.document, ensure_ascii=False, indent=2)
+        for size in (1, 2, 3, 7, 64, len(document) * 4):
+            with self.subTest(size=size):
+                fields = {}
+                actual = list(iter_json_array(chunked(document, size), "items", fields))
+
+                self.assertEqual(self.document["items"], actual)
+
+    def test_stores_other_members_in_fields(self):
+        fields = {}
+        list(iter_json_array([json.dumps(self.document)], "items", fields))
+
+        self.assertEqual(
+            {"availableItems": 3, "errorType": None, "isError": False}, fields
+        )
+
+    def test_members_before_array_are_available_while_iterating(self):
+        fields = {}
+        items = iter_json_array([json.dumps(self.document)], "items", fields)
+
+        next(items)
+
+        self.assertEqual(3, fields["availableItems"])
+
+    def test_number_split_across_chunks_is_not_truncated(self):
+        actual = list(iter_json_array(['{"items": [12', "34]}"], "items", {}))
+
+        self.assertEqual([1234], actual)
+
+    def test_floats_split_at_every_position_are_not_truncated(self):
+        document = '{"x": 1e5, "items": [1.5, -2, 3.25e-2, 4E+1], "y": -0.5}'
+        for size in (1, 2, 3):
+            with self.subTest(size=size):
+                fields = {}
+                actual = list(iter_json_array(chunked(document, size), "items", fields))
+
+                self.assertEqual([1.5, -2, 3.25e-2, 4e1], actual)
+                self.assertEqual({"x": 1e5, "y": -0.5}, fields)
+
+    def test_empty_array_yields_nothing(self):
+        actual = list(iter_json_array(['{"items": [], "isError": false}'], "items", {}))
+
+        self.assertEqual([], actual)
+
+    def test_empty_object_yields_nothing(self):
+        self.assertEqual([], list(iter_json_array(["{}"], "items", {})))
+
+    def test_truncated_document_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(['{"items": [1, 2'], "items", {}))
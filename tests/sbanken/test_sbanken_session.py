@@ -1,7 +1,9 @@
+import json
 import unittest
+from datetime import date
 import unittest.mock as mock
 
-from sbankensheets.sbanken import SbankenSession, SbankenError
+from sbankensheets.sbanken import SbankenSession, SbankenError, date_shards
 
 
 class TestSbanken(unittest.TestCase):
@@ -78,6 +80,164 @@ class TestSbanken(unittest.TestCase):
         account_id = "test-account-id"
         self.assertRaises(SbankenError, self.sbanken.get_transactions, account_id)
 
+    def test_get_all_transactions_fetches_remaining_pages(self):
+        self.sbanken.session.get().json.side_effect = [
+            {"items": [{"n": 1}, {"n": 2}], "availableItems": 5, "isError": False},
+            {"items": [{"n": 3}, {"n": 4}], "availableItems": 5, "isError": False},
+            {"items": [{"n": 5}], "availableItems": 5, "isError": False},
+        ]
+        # Reset number of times called
+        self.sbanken.session.get.reset_mock()
+
+        account_id = "test-account-id"
+        self.sbanken.get_all_transactions(account_id, page_size=2, max_workers=1)
+
+        indices = [
+            call[1]["params"]["index"]
+            for call in self.sbanken.session.get.call_args_list
+        ]
+        self.assertEqual(["0", "2", "4"], indices)
+
+    def test_get_all_transactions_returns_pages_in_order(self):
+        self.sbanken.session.get().json.side_effect = [
+            {"items": [{"n": 1}, {"n": 2}], "availableItems": 5, "isError": False},
+            {"items": [{"n": 3}, {"n": 4}], "availableItems": 5, "isError": False},
+            {"items": [{"n": 5}], "availableItems": 5, "isError": False},
+        ]
+        self.Transaction.side_effect = lambda x: x
+        self.sbanken._remove_unbooked_transactions = list
+
+        account_id = "test-account-id"
+        actual = self.sbanken.get_all_transactions(
+            account_id, page_size=2, max_workers=1
+        )
+
+        self.assertEqual([{"n": n} for n in range(1, 6)], actual)
+
+    def test_get_all_transactions_single_page_calls_get_once(self):
+        self.sbanken.session.get().json.return_value = {
+            "items": [{"n": 1}],
+            "availableItems": 1,
+            "isError": False,
+        }
+        # Reset number of times called
+        self.sbanken.session.get.reset_mock()
+
+        self.sbanken.get_all_transactions("test-account-id")
+
+        self.sbanken.session.get.assert_called_once()
+
+    def test_get_all_transactions_page_is_error_raise_sbanken_error(self):
+        self.sbanken.session.get().json.side_effect = [
+            {"items": [{"n": 1}, {"n": 2}], "availableItems": 4, "isError": False},
+            {"isError": True, "errorType": None, "errorMessage": None},
+        ]
+
+        self.assertRaises(
+            SbankenError,
+            self.sbanken.get_all_transactions,
+            "test-account-id",
+            page_size=2,
+        )
+
+    def test_backfill_transactions_fetches_each_shard(self):
+        self.sbanken.get_all_transactions = mock.MagicMock(return_value=[])
+
+        self.sbanken.backfill_transactions(
+            "test-account-id", "2018-01-15", "2018-03-10", max_workers=1
+        )
+
+        dates = [
+            (call[1]["start_date"], call[1]["end_date"])
+            for call in self.sbanken.get_all_transactions.call_args_list
+        ]
+        self.assertEqual(
+            [
+                ("2018-03-01", "2018-03-10"),
+                ("2018-02-01", "2018-02-28"),
+                ("2018-01-15", "2018-01-31"),
+            ],
+            dates,
+        )
+
+    def test_backfill_transactions_merges_newest_first_without_boundary_duplicates(
+        self,
+    ):
+        def transaction(id):
+            return mock.MagicMock(id=id)
+
+        boundary = [transaction("boundary-1"), transaction("boundary-2")]
+        shards = {
+            "2018-02-01": [transaction("feb")] + boundary[:1],
+            "2018-01-01": boundary + [transaction("jan")],
+        }
+        self.sbanken.get_all_transactions = mock.MagicMock(
+            side_effect=lambda account_id, start_date, **kwargs: shards[start_date]
+        )
+
+        actual = self.sbanken.backfill_transactions(
+            "test-account-id", "2018-01-01", "2018-02-28"
+        )
+
+        self.assertEqual(
+            ["feb", "boundary-1", "boundary-2", "jan"], [t.id for t in actual]
+        )
+
+    def test_scheduler_sends_get_requests(self):
+        self.sbanken.scheduler = mock.MagicMock()
+        self.sbanken.scheduler.request.side_effect = lambda send: send()
+        self.sbanken.session.get().json.return_value = {"items": [], "isError": False}
+
+        self.sbanken.get_accounts()
+
+        self.sbanken.scheduler.request.assert_called_once()
+
+    def _stream(self, *documents):
+        responses = []
+        for document in documents:
+            response = mock.MagicMock()
+            response.__enter__.return_value.iter_content.return_value = [
+                json.dumps(document).encode("utf-8")
+            ]
+            responses.append(response)
+        self.sbanken.session.get.side_effect = responses
+
+    def test_iter_transactions_calls_get_with_stream(self):
+        self._stream({"items": [], "isError": False})
+
+        list(self.sbanken.iter_transactions("test-account-id"))
+
+        self.assertTrue(self.sbanken.session.get.call_args[1]["stream"])
+
+    def test_iter_transactions_yields_transactions(self):
+        self._stream({"items": [{"n": 1}, {"n": 2}], "isError": False})
+        self.Transaction.side_effect = lambda x: x
+        self.sbanken._remove_unbooked_transactions = list
+
+        actual = list(self.sbanken.iter_transactions("test-account-id"))
+
+        self.assertEqual([{"n": 1}, {"n": 2}], actual)
+
+    def test_iter_transactions_response_is_error_raise_sbanken_error(self):
+        self._stream({"isError": True, "errorType": None, "errorMessage": None})
+
+        with self.assertRaises(SbankenError):
+            list(self.sbanken.iter_transactions("test-account-id"))
+
+    def test_iter_all_transactions_streams_every_page(self):
+        self._stream(
+            {"availableItems": 3, "items": [{"n": 1}, {"n": 2}], "isError": False},
+            {"availableItems": 3, "items": [{"n": 3}], "isError": False},
+        )
+        self.Transaction.side_effect = lambda x: x
+        self.sbanken._remove_unbooked_transactions = list
+
+        actual = list(
+            self.sbanken.iter_all_transactions("test-account-id", page_size=2)
+        )
+
+        self.assertEqual([{"n": 1}, {"n": 2}, {"n": 3}], actual)
+
     def test_get_accounts_calls_get_with_correct_args(self):
         self.sbanken.session.get().json.return_value = {"items": [], "isError": False}
         # Reset number of times called
@@ -180,6 +340,38 @@ class TestSbanken(unittest.TestCase):
 
         self.assertIsNone(response)
 
+    def test_get_account_twice_calls_get_once(self):
+        self.sbanken.session.get().json.return_value = {"items": [], "isError": False}
+        # Reset number of times called
+        self.sbanken.session.get.reset_mock()
+
+        self.sbanken.get_account("test-account-name")
+        self.sbanken.get_accounts()
+
+        self.sbanken.session.get.assert_called_once()
+
+    def test_invalidate_accounts_calls_get_again(self):
+        self.sbanken.session.get().json.return_value = {"items": [], "isError": False}
+        # Reset number of times called
+        self.sbanken.session.get.reset_mock()
+
+        self.sbanken.get_accounts()
+        self.sbanken.invalidate_accounts()
+        self.sbanken.get_accounts()
+
+        self.assertEqual(2, self.sbanken.session.get.call_count)
+
+    def test_get_account_by_id_returns_correct_account(self):
+        items = [{"accountId": "wrong-id"}, {"accountId": "correct-id"}]
+        self.sbanken.session.get().json.return_value = {
+            "items": items,
+            "isError": False,
+        }
+
+        actual = self.sbanken.get_account_by_id("correct-id")
+
+        self.assertEqual(items[1], actual)
+
     def test_get_account_response_is_error_raise_sbanken_error(self):
         self.sbanken.session.get().json.return_value = {
             "isError": True,
@@ -190,6 +382,34 @@ class TestSbanken(unittest.TestCase):
         account_name = "test-account-name"
         self.assertRaises(SbankenError, self.sbanken.get_account, account_name)
 
+    @mock.patch("sbankensheets.sbanken.sbanken_session.threading")
+    def test_token_cache_fetch_used_for_token(self, mock_threading):
+        token_cache = mock.MagicMock()
+        token_cache.refresh_in.return_value = 10
+
+        sbanken = SbankenSession(token_cache=token_cache)
+
+        token_cache.fetch.assert_called_once()
+        self.assertEqual(token_cache.fetch(), sbanken.session.token)
+
+    @mock.patch("sbankensheets.sbanken.sbanken_session.threading")
+    def test_token_cache_schedules_refresh(self, mock_threading):
+        token_cache = mock.MagicMock()
+        token_cache.refresh_in.return_value = 10
+
+        sbanken = SbankenSession(token_cache=token_cache)
+
+        mock_threading.Timer.assert_called_once_with(10, sbanken._refresh_token)
+        mock_threading.Timer().start.assert_called_once()
+
+    @mock.patch("sbankensheets.sbanken.sbanken_session.threading")
+    def test_close_cancels_refresh(self, mock_threading):
+        sbanken = SbankenSession(token_cache=mock.MagicMock())
+
+        sbanken.close()
+
+        mock_threading.Timer().cancel.assert_called_once()
+
     @mock.patch(
         "sbankensheets.sbanken.sbanken_session.SbankenSession.unstable_transaction_keys"
     )
@@ -227,3 +447,40 @@ class TestSbanken(unittest.TestCase):
         )
 
         self.assertEqual(expected, actual)
+
+
+class TestDateShards(unittest.TestCase):
+    def test_month_shards_follow_calendar_months(self):
+        self.assertEqual(
+            [
+                (date(2018, 1, 15), date(2018, 1, 31)),
+                (date(2018, 2, 1), date(2018, 2, 28)),
+                (date(2018, 3, 1), date(2018, 3, 10)),
+            ],
+            date_shards("2018-01-15", "2018-03-10"),
+        )
+
+    def test_week_shards_start_on_mondays(self):
+        self.assertEqual(
+            [
+                (date(2018, 9, 6), date(2018, 9, 9)),
+                (date(2018, 9, 10), date(2018, 9, 16)),
+                (date(2018, 9, 17), date(2018, 9, 18)),
+            ],
+            date_shards(date(2018, 9, 6), date(2018, 9, 18), "week"),
+        )
+
+    def test_day_shards(self):
+        self.assertEqual(
+            [
+                (date(2018, 9, 1), date(2018, 9, 10)),
+                (date(2018, 9, 11), date(2018, 9, 12)),
+            ],
+            date_shards("2018-09-01", "2018-09-12", 10),
+        )
+
+    def test_start_after_end_returns_no_shards(self):
+        self.assertEqual([], date_shards("2018-09-02", "2018-09-01"))
+
+    def test_invalid_shard_raise_value_error(self):
+        self.assertRaises(ValueError, date_shards, "2018-09-01", "2018-09-12", "year")
@@ -0,0 +1,101 @@
+import unittest
+import unittest.mock as mock
+
+import requests
+
+from sbankensheets.sbanken.errors import SbankenError
+from sbankensheets.sbanken.scheduler import RequestScheduler
+
+
+def response(status_code, retry_after=None):
+    mock_response = mock.MagicMock()
+    mock_response.status_code = status_code
+    mock_response.headers = {"Retry-After": retry_after} if retry_after else {}
+    return mock_response
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.time = mock.patch("sbankensheets.sbanken.scheduler.time").start()
+        self.time.monotonic.return_value = 100.0
+        self.scheduler = RequestScheduler(rate=2, burst=2, max_retries=3)
+
+    def tearDown(self):
+        super().tearDown()
+        mock.patch.stopall()
+
+    def test_reserve_within_burst_returns_no_delay(self):
+        self.assertEqual([0, 0], [self.scheduler.reserve() for _ in range(2)])
+
+    def test_reserve_beyond_burst_returns_delay_by_rate(self):
+        delays = [self.scheduler.reserve() for _ in range(4)]
+
+        self.assertEqual([0, 0, 0.5, 1.0], delays)
+
+    def test_reserve_refills_over_time(self):
+        for _ in range(2):
+            self.scheduler.reserve()
+
+        self.time.monotonic.return_value = 101.0
+
+        self.assertEqual(0, self.scheduler.reserve())
+
+    def test_retry_delay_success_returns_none(self):
+        self.assertIsNone(self.scheduler.retry_delay(0, 200))
+
+    def test_retry_delay_client_error_returns_none(self):
+        self.assertIsNone(self.scheduler.retry_delay(0, 404))
+
+    def test_retry_delay_server_error_is_jittered_exponential(self):
+        for attempt in range(3):
+            delay = self.scheduler.retry_delay(attempt, 503)
+            self.assertTrue(0 <= delay <= self.scheduler.backoff_base * 2**attempt)
+
+    def test_retry_delay_honors_retry_after(self):
+        self.assertEqual(7, self.scheduler.retry_delay(0, 429, "7"))
+
+    def test_retry_delay_after_max_retries_returns_none(self):
+        self.assertIsNone(self.scheduler.retry_delay(3, 503))
+
+    def test_throttled_response_pauses_reserve(self):
+        self.scheduler.retry_delay(0, 429, "10")
+
+        self.assertEqual(10, self.scheduler.reserve())
+
+    def test_request_retries_until_success(self):
+        send = mock.Mock(side_effect=[response(429, "1"), response(502), response(200)])
+
+        actual = self.scheduler.request(send)
+
+        self.assertEqual(200, actual.status_code)
+        self.assertEqual(3, send.call_count)
+        self.assertEqual(1, self.scheduler.stats.throttled)
+        self.assertEqual(2, self.scheduler.stats.retried)
+
+    def test_request_raises_after_max_retries(self):
+        send = mock.Mock(return_value=response(503))
+
+        with self.assertRaises(SbankenError) as context:
+            self.scheduler.request(send)
+
+        self.assertIn("503", str(context.exception))
+        self.assertEqual(4, send.call_count)
+
+    def test_request_returns_client_error_response(self):
+        send = mock.Mock(return_value=response(404))
+
+        self.assertEqual(404, self.scheduler.request(send).status_code)
+        self.assertEqual(1, send.call_count)
+
+    def test_request_retries_connection_errors(self):
+        send = mock.Mock(side_effect=[requests.ConnectionError(), response(200)])
+
+        actual = self.scheduler.request(send)
+
+        self.assertEqual(200, actual.status_code)
+
+    def test_request_raises_connection_error_after_max_retries(self):
+        send = mock.Mock(side_effect=requests.ConnectionError())
+
+        self.assertRaises(requests.ConnectionError, self.scheduler.request, send)
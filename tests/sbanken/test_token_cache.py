@@ -0,0 +1,72 @@
+import os
+import tempfile
+import time
+import unittest
+import unittest.mock as mock
+
+from sbankensheets.sbanken.token_cache import TokenCache
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = TokenCache(
+            os.path.join(self.directory.name, "tokens.json"), refresh_margin=60
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def test_get_missing_client_id_returns_none(self):
+        self.assertIsNone(self.cache.get("test-client-id"))
+
+    def test_put_then_get_returns_token(self):
+        token = {"access_token": "test-token", "expires_in": 3600}
+
+        stored = self.cache.put("test-client-id", token)
+
+        self.assertEqual(stored, self.cache.get("test-client-id"))
+
+    def test_put_sets_expires_at_from_expires_in(self):
+        token = self.cache.put("test-client-id", {"expires_in": 3600})
+
+        self.assertAlmostEqual(time.time() + 3600, token["expires_at"], delta=5)
+
+    def test_get_token_within_refresh_margin_returns_none(self):
+        self.cache.put("test-client-id", {"expires_at": time.time() + 30})
+
+        self.assertIsNone(self.cache.get("test-client-id"))
+
+    def test_get_is_keyed_by_client_id(self):
+        self.cache.put("test-client-id", {"expires_in": 3600})
+
+        self.assertIsNone(self.cache.get("other-client-id"))
+
+    def test_fetch_valid_token_does_not_call_fetch_token(self):
+        self.cache.put("test-client-id", {"expires_in": 3600})
+        fetch_token = mock.Mock()
+
+        self.cache.fetch("test-client-id", fetch_token)
+
+        fetch_token.assert_not_called()
+
+    def test_fetch_no_token_calls_fetch_token_and_stores_it(self):
+        fetch_token = mock.Mock(return_value={"access_token": "t", "expires_in": 3600})
+
+        token = self.cache.fetch("test-client-id", fetch_token)
+
+        fetch_token.assert_called_once()
+        self.assertEqual(token, self.cache.get("test-client-id"))
+
+    def test_cache_is_shared_between_instances(self):
+        self.cache.put("test-client-id", {"expires_in": 3600})
+        other = TokenCache(self.cache.path)
+
+        self.assertIsNotNone(other.get("test-client-id"))
+
+    def test_refresh_in_subtracts_refresh_margin(self):
+        token = {"expires_at": time.time() + 120}
+
+        self.assertAlmostEqual(60, self.cache.refresh_in(token), delta=5)
@@ -1,11 +1,17 @@
 import unittest
 import unittest.mock as mock
+from datetime import date
 
 from sbankensheets.sbanken.transaction import (
     Transaction,
     divide_transactions,
     filter_transactions,
     cell_values_to_transactions,
+    cell_values_to_ids,
+    is_legacy_id,
+    migrate_id,
+    normalize_merchant,
+    parse_date,
 )
 
 
@@ -69,38 +75,60 @@ class TestTransaction(unittest.TestCase):
     def test_to_sheets_row_with_encoding(self):
         trans = self.transaction
         amount = str(-trans.amount).replace(".", ",")
-        expected = [trans._encode(), trans.extract_date(), amount, trans.text, ""]
+        expected = [trans.id, trans.extract_date(), amount, trans.text, ""]
         actual = self.transaction.to_sheets_row(encode=True)
 
         self.assertEqual(actual, expected)
 
-    @mock.patch("sbankensheets.sbanken.transaction.dateutil.parser")
-    def test_extract_date_no_card_details_calls_parser_with_correct_data(
-        self, mock_parser
-    ):
+    def test_extract_date_no_card_details_returns_accounting_date(self):
+        self.assertEqual("2018-08-21", self.transaction.extract_date())
+
+    @mock.patch("sbankensheets.sbanken.transaction.parse_date")
+    def test_extract_date_parses_once(self, mock_parse_date):
         self.transaction.extract_date()
-        mock_parser.parse.assert_called_once_with(self.data["accountingDate"])
+        self.transaction.extract_date()
+        mock_parse_date.assert_called_once_with(self.data["accountingDate"])
 
-    @mock.patch("sbankensheets.sbanken.transaction.dateutil.parser")
-    def test_extract_date_no_card_details_returns_time_date_isoformat(
-        self, mock_parser
-    ):
-        time = self.transaction.extract_date()
-        self.assertEqual(time, mock_parser.parse().date().isoformat())
+    def test_fields_are_extracted_on_construction(self):
+        self.assertEqual(self.data["amount"], self.transaction.amount)
+        self.assertEqual(self.data["text"], self.transaction.text)
+        self.assertEqual(
+            self.data["transactionTypeCode"], self.transaction.transaction_type_code
+        )
 
-    @mock.patch("sbankensheets.sbanken.transaction.dateutil.parser")
-    def test_extract_date_with_card_details(self, mock_parser):
-        self.transaction_with_card_details.extract_date()
-        mock_parser.parse.assert_called_once_with(
-            self.data_with_card_details["cardDetails"]["purchaseDate"]
+    def test_has_no_instance_dict(self):
+        self.assertFalse(hasattr(self.transaction, "__dict__"))
+
+    def test_extract_date_with_card_details_returns_purchase_date(self):
+        self.assertEqual(
+            "2018-08-11", self.transaction_with_card_details.extract_date()
         )
 
-    @mock.patch("sbankensheets.sbanken.transaction.dateutil.parser")
-    def test_extract_date_with_card_details_returns_time_date_isoformat(
-        self, mock_parser
+    @mock.patch("sbankensheets.sbanken.transaction.parse_date")
+    def test_extract_date_with_card_details_parses_purchase_date(
+        self, mock_parse_date
     ):
         time = self.transaction_with_card_details.extract_date()
-        self.assertEqual(time, mock_parser.parse().date().isoformat())
+        mock_parse_date.assert_called_once_with(
+            self.data_with_card_details["cardDetails"]["purchaseDate"]
+        )
+        self.assertEqual(time, mock_parse_date().isoformat())
+
+    def test_content_hash_is_equal_for_equal_content(self):
+        self.assertEqual(
+            self.transaction.content_hash, Transaction(dict(self.data)).content_hash
+        )
+
+    def test_content_hash_differs_for_different_content(self):
+        self.assertNotEqual(
+            self.transaction.content_hash,
+            self.transaction_with_card_details.content_hash,
+        )
+
+    def test_accounting_date_returns_date(self):
+        self.assertEqual(
+            "2018-08-14", self.transaction_with_card_details.accounting_date.isoformat()
+        )
 
     @mock.patch("sbankensheets.sbanken.transaction.base64")
     @mock.patch("sbankensheets.sbanken.transaction.pickle")
@@ -165,7 +193,7 @@ class TestTransaction(unittest.TestCase):
         same_mocks = [mock.MagicMock() for _ in range(2)]
         only_first_mocks = [mock.MagicMock() for _ in range(3)]
         first = same_mocks + only_first_mocks
-        second = same_mocks + [mock.MagicMock() for _ in range(4)]
+        second = [x.id for x in same_mocks + [mock.MagicMock() for _ in range(4)]]
 
         results = filter_transactions(first, second)
 
@@ -174,6 +202,23 @@ class TestTransaction(unittest.TestCase):
             and len(results) == len(only_first_mocks)
         )
 
+    def test_filter_transactions_keeps_surplus_identical_transactions(self):
+        first = [Transaction(self.data) for _ in range(3)]
+        second = [first[0].id, first[0].id]
+
+        results = filter_transactions(first, second)
+
+        self.assertEqual(1, len(results))
+        self.assertIs(first[2], results[0])
+
+    def test_filter_transactions_preserves_order(self):
+        first = [mock.MagicMock() for _ in range(5)]
+        second = [first[1].id, first[3].id]
+
+        results = filter_transactions(first, second)
+
+        self.assertEqual([first[0], first[2], first[4]], results)
+
     @mock.patch("sbankensheets.sbanken.transaction.Transaction")
     def test_cell_values_to_transactions_calls_decode_on_0_index_for_each_cell_value(
         self, mock_transaction
@@ -187,3 +232,100 @@ class TestTransaction(unittest.TestCase):
         actual = mock_transaction._decode.call_args_list
 
         self.assertEqual(expected, actual)
+
+    def test_id_is_fixed_length_content_hash(self):
+        self.assertEqual(32, len(self.transaction.id))
+        self.assertEqual(self.transaction.content_hash, self.transaction.id)
+
+    def test_is_legacy_id(self):
+        self.assertTrue(is_legacy_id(self.transaction._encode()))
+        self.assertFalse(is_legacy_id(self.transaction.id))
+
+    def test_migrate_id_legacy_id_returns_content_hash(self):
+        legacy_id = self.transaction._encode()
+
+        self.assertEqual(self.transaction.id, migrate_id(legacy_id))
+
+    def test_migrate_id_content_hash_returns_id(self):
+        self.assertEqual(self.transaction.id, migrate_id(self.transaction.id))
+
+    def test_cell_values_to_ids_migrates_legacy_ids(self):
+        cell_values = [
+            [self.transaction._encode()],
+            [self.transaction_with_card_details.id],
+        ]
+
+        actual = list(cell_values_to_ids(cell_values))
+
+        self.assertEqual(
+            [self.transaction.id, self.transaction_with_card_details.id], actual
+        )
+
+
+class TestParseDate(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        parse_date.cache_clear()
+
+    @mock.patch("sbankensheets.sbanken.transaction.dateutil.parser")
+    def test_iso_timestamps_do_not_use_dateutil(self, mock_parser):
+        for timestamp in [
+            "2018-08-14T00:00:00+02:00",
+            "2018-08-14T00:00:00",
+            "2018-08-14",
+        ]:
+            with self.subTest(timestamp=timestamp):
+                self.assertEqual(date(2018, 8, 14), parse_date(timestamp))
+        mock_parser.parse.assert_not_called()
+
+    def test_keeps_the_date_of_the_time_zone(self):
+        self.assertEqual(date(2018, 8, 14), parse_date("2018-08-14T23:30:00-05:00"))
+
+    def test_falls_back_to_dateutil(self):
+        for timestamp in ["14 Aug 2018", "2018/08/14 00:00", "20180814T000000"]:
+            with self.subTest(timestamp=timestamp):
+                self.assertEqual(date(2018, 8, 14), parse_date(timestamp))
+
+    def test_memoizes_timestamps(self):
+        parse_date("2018-08-14T00:00:00+02:00")
+        parse_date("2018-08-14T00:00:00+02:00")
+        self.assertEqual(1, parse_date.cache_info().hits)
+
+
+class TestNormalizeMerchant(unittest.TestCase):
+    def test_removes_volatile_fragments(self):
+        cases = {
+            "*0054 11.08 NOK 109.00 Spotify P0701F7525 Kurs: 1.0000": "* spotify p0701f7525",
+            "*1234 02.09 NOK 45.20 REMA 1000 MAJORSTUEN Kurs: 1.0000": "* rema 1000 majorstuen",
+            "*9999 31.12 USD 12.99 NETFLIX.COM 4029357733 Kurs: 9.1234": "* netflix.com",
+            "Nettgiro til: Fjordkraft AS Betalt: 14.08.18": "nettgiro til: fjordkraft as betalt:",
+            "Kiwi 14.08.18 12:05 0123456": "kiwi",
+            "KIWI 505 BARCODE": "kiwi 505 barcode",
+            "Straksoverføring": "straksoverføring",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(expected, normalize_merchant(text))
+
+    def test_same_merchant_has_same_key(self):
+        self.assertEqual(
+            normalize_merchant(
+                "*0054 11.08 NOK 109.00 Spotify 4029357733 Kurs: 1.0000"
+            ),
+            normalize_merchant(
+                "*0187 11.09 NOK 119.00 Spotify 5130468844 Kurs: 1.0000"
+            ),
+        )
+
+    def test_keeps_names_with_digits(self):
+        cases = {
+            "*1234 02.09 NOK 45.20 REMA1000 MAJORSTUEN Kurs: 1.0000": "* rema1000 majorstuen",
+            "SATS24 Bislett": "sats24 bislett",
+        }
+        for text, expected in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(expected, normalize_merchant(text))
+
+    def test_transaction_merchant(self):
+        transaction = Transaction({"text": "*0054 11.08 NOK 109.00 Spotify 4029357733"})
+        self.assertEqual("* spotify", transaction.merchant)
@@ -0,0 +1,113 @@
+import unittest
+
+from sbankensheets.sbanken.transaction import Transaction, divide_transactions
+from sbankensheets.sbanken.transaction_batch import Rule, Summary, TransactionBatch
+
+
+def make_transaction(
+    amount: float, type_code: int = 714, accounting_date="2018-08-14", text="Kiwi"
+):
+    return Transaction(
+        {
+            "cardDetailsSpecified": False,
+            "accountingDate": f"{accounting_date}T00:00:00+02:00",
+            "amount": amount,
+            "text": text,
+            "transactionType": "Varekjøp",
+            "transactionTypeCode": type_code,
+        }
+    )
+
+
+class TestTransactionBatch(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.transactions = [
+            make_transaction(-10.0, accounting_date="2018-08-01"),
+            make_transaction(2000.0, 203, accounting_date="2018-08-15"),
+            make_transaction(-500.0, 200, accounting_date="2018-08-20"),
+            make_transaction(-25.5, accounting_date="2018-09-02"),
+            make_transaction(0.0, accounting_date="2018-09-03"),
+        ]
+        self.batch = TransactionBatch(self.transactions)
+        self.rules = (
+            ("expenses", Rule(sign=-1, exclude_type_codes=(200,))),
+            ("income", Rule(sign=1, exclude_type_codes=(200,))),
+            ("savings", Rule(sign=-1, type_codes=(200,))),
+        )
+
+    def test_iterates_transactions_in_order(self):
+        self.assertEqual(self.transactions, list(self.batch))
+        self.assertEqual(len(self.transactions), len(self.batch))
+
+    def test_divide_matches_divide_transactions_with_rules(self):
+        expected = divide_transactions(self.transactions, self.rules)
+
+        actual = self.batch.divide(self.rules)
+
+        self.assertEqual(expected, {k: v.to_list() for k, v in actual.items()})
+
+    def test_divide(self):
+        actual = self.batch.divide(self.rules)
+
+        self.assertEqual(
+            [self.transactions[0], self.transactions[3]], list(actual["expenses"])
+        )
+        self.assertEqual([self.transactions[1]], list(actual["income"]))
+        self.assertEqual([self.transactions[2]], list(actual["savings"]))
+
+    def test_select_by_amount_and_date(self):
+        rule = Rule(min_amount=-100, max_amount=0, start_date="2018-08-02")
+
+        self.assertEqual(self.transactions[3:], list(self.batch.select(rule)))
+        self.assertEqual(
+            self.transactions[3:], [t for t in self.transactions if rule(t)]
+        )
+
+    def test_summarize(self):
+        actual = self.batch.summarize(self.rules)
+
+        self.assertEqual(Summary(2, -35.5), actual["expenses"])
+        self.assertEqual(Summary(1, 2000.0), actual["income"])
+        self.assertEqual(Summary(1, -500.0), actual["savings"])
+
+    def test_sub_batches_keep_columns_aligned(self):
+        sub_batch = self.batch[self.batch.amount < 0][1:]
+
+        self.assertEqual([-500.0, -25.5], sub_batch.amount.tolist())
+        self.assertEqual([200, 714], sub_batch.transaction_type_code.tolist())
+        self.assertIs(self.transactions[2], sub_batch[0])
+
+    def test_empty_batch(self):
+        batch = TransactionBatch([])
+
+        self.assertEqual({"expenses": Summary(0, 0.0)}, batch.summarize(self.rules[:1]))
+        self.assertEqual([], batch.select(self.rules[0][1]).to_list())
+
+    def test_summarize_by_merchant(self):
+        batch = TransactionBatch(
+            [
+                make_transaction(
+                    -10.0, text="*0054 11.08 NOK 10.00 Kiwi 505 Kurs: 1.0000"
+                ),
+                make_transaction(
+                    -20.0, text="*0054 12.08 NOK 20.00 Kiwi 505 Kurs: 1.0000"
+                ),
+                make_transaction(-109.0, text="Spotify 4029357733"),
+            ]
+        )
+
+        self.assertEqual(
+            {"* kiwi 505": Summary(2, -30.0), "spotify": Summary(1, -109.0)},
+            batch.summarize_by_merchant(),
+        )
+
+    def test_dates_are_only_parsed_for_date_rules(self):
+        batch = TransactionBatch([make_transaction(-10.0), make_transaction(-20.0)])
+
+        batch.divide(self.rules)
+        self.assertIsNone(batch[0]._accounting_date)
+
+        selected = batch.select(Rule(end_date="2018-08-14"))
+        self.assertEqual(2, len(selected))
+        self.assertIsNotNone(selected[0]._accounting_date)
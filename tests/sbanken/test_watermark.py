@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from sbankensheets.sbanken.transaction import Transaction
+from sbankensheets.sbanken.watermark import WatermarkStore
+
+
+def make_transaction(accounting_date: str, text: str = "Kiwi", amount=-10.0):
+    return Transaction(
+        {
+            "cardDetailsSpecified": False,
+            "accountingDate": f"{accounting_date}T00:00:00+02:00",
+            "amount": amount,
+            "text": text,
+            "transactionType": "Varekjøp",
+            "transactionTypeCode": 714,
+        }
+    )
+
+
+class TestWatermarkStore(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = WatermarkStore(
+            os.path.join(self.directory.name, "watermarks.json"), overlap_days=3
+        )
+
+    def tearDown(self):
+        super().tearDown()
+        self.directory.cleanup()
+
+    def test_start_date_no_watermark_returns_default(self):
+        self.assertEqual(
+            "2018-08-12", self.store.start_date("account", default="2018-08-12")
+        )
+
+    def test_start_date_is_overlap_days_before_watermark(self):
+        self.store.advance("account", [make_transaction("2018-09-10")])
+
+        self.assertEqual("2018-09-07", self.store.start_date("account"))
+
+    def test_watermark_is_per_account(self):
+        self.store.advance("account", [make_transaction("2018-09-10")])
+
+        self.assertIsNone(self.store.start_date("other-account"))
+
+    def test_filter_new_no_watermark_returns_all(self):
+        transactions = [make_transaction("2018-09-10")]
+
+        self.assertEqual(transactions, self.store.filter_new("account", transactions))
+
+    def test_filter_new_drops_seen_transactions(self):
+        seen = make_transaction("2018-09-10", "Rema")
+        self.store.advance("account", [seen, make_transaction("2018-09-01")])
+        new = make_transaction("2018-09-09", "Kiwi")
+
+        actual = self.store.filter_new("account", [new, seen])
+
+        self.assertEqual([new], actual)
+
+    def test_filter_new_keeps_surplus_identical_transactions(self):
+        self.store.advance("account", [make_transaction("2018-09-10")])
+        transactions = [make_transaction("2018-09-10"), make_transaction("2018-09-10")]
+
+        actual = self.store.filter_new("account", transactions)
+
+        self.assertEqual(transactions[1:], actual)
+
+    def test_advance_only_keeps_ids_within_overlap_window(self):
+        self.store.advance(
+            "account",
+            [make_transaction("2018-09-10"), make_transaction("2018-09-01", "Rema")],
+        )
+
+        watermark = self.store.get("account")
+
+        self.assertEqual("2018-09-10", watermark["date"])
+        self.assertEqual([make_transaction("2018-09-10").id], list(watermark["ids"]))
+
+    def test_advance_no_transactions_keeps_watermark(self):
+        self.store.advance("account", [make_transaction("2018-09-10")])
+
+        self.store.advance("account", [])
+
+        self.assertEqual("2018-09-10", self.store.get("account")["date"])
+
+    def test_advance_never_moves_watermark_backwards(self):
+        self.store.advance("account", [make_transaction("2018-09-10")])
+
+        self.store.advance("account", [make_transaction("2018-09-08")])
+
+        self.assertEqual("2018-09-10", self.store.get("account")["date"])
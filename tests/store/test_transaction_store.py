@@ -0,0 +1,112 @@
+import unittest
+
+from sbankensheets.sbanken.transaction import Transaction
+from sbankensheets.store import TransactionStore
+
+
+def make_transaction(accounting_date: str, text: str = "Kiwi", amount=-10.0):
+    return Transaction(
+        {
+            "cardDetailsSpecified": False,
+            "accountingDate": f"{accounting_date}T00:00:00+02:00",
+            "amount": amount,
+            "text": text,
+            "transactionType": "Varekjøp",
+            "transactionTypeCode": 714,
+        }
+    )
+
+
+class TestTransactionStore(unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.store = TransactionStore(":memory:")
+
+    def tearDown(self):
+        super().tearDown()
+        self.store.close()
+
+    def test_upsert_then_transactions_returns_transactions(self):
+        transaction = make_transaction("2018-09-10")
+
+        self.store.upsert("account", [transaction])
+
+        actual = self.store.transactions("account")
+        self.assertEqual([transaction._data], [t._data for t in actual])
+
+    def test_upsert_same_batch_twice_is_idempotent(self):
+        transactions = [make_transaction("2018-09-10"), make_transaction("2018-09-11")]
+
+        self.store.upsert("account", transactions)
+        self.store.upsert("account", transactions)
+
+        self.assertEqual(2, self.store.count("account"))
+
+    def test_upsert_stores_identical_transactions_per_occurrence(self):
+        transactions = [make_transaction("2018-09-10"), make_transaction("2018-09-10")]
+
+        self.store.upsert("account", transactions)
+
+        self.assertEqual(2, self.store.occurrences(transactions[0], "account"))
+
+    def test_upsert_later_fetch_adds_new_identical_transaction(self):
+        transaction = make_transaction("2018-09-10")
+        self.store.upsert("account", [transaction])
+
+        self.store.upsert("account", [transaction, make_transaction("2018-09-10")])
+
+        self.assertEqual(2, self.store.occurrences(transaction, "account"))
+
+    def test_upsert_updates_category(self):
+        transaction = make_transaction("2018-09-10")
+        self.store.upsert("account", [transaction])
+
+        transaction.category = "Dagligvare"
+        self.store.upsert("account", [transaction])
+
+        self.assertEqual("Dagligvare", self.store.transactions("account")[0].category)
+
+    def test_upsert_empty_category_keeps_category(self):
+        transaction = make_transaction("2018-09-10")
+        transaction.category = "Dagligvare"
+        self.store.upsert("account", [transaction])
+
+        self.store.upsert("account", [make_transaction("2018-09-10")])
+
+        self.assertEqual("Dagligvare", self.store.transactions("account")[0].category)
+
+    def test_transactions_are_newest_first(self):
+        self.store.upsert(
+            "account", [make_transaction("2018-09-01"), make_transaction("2018-09-10")]
+        )
+
+        dates = [t.accounting_date.isoformat() for t in self.store.transactions()]
+
+        self.assertEqual(["2018-09-10", "2018-09-01"], dates)
+
+    def test_transactions_filters_on_account_and_dates(self):
+        self.store.upsert(
+            "account",
+            [
+                make_transaction("2018-09-01"),
+                make_transaction("2018-09-05"),
+                make_transaction("2018-09-10"),
+            ],
+        )
+        self.store.upsert("other-account", [make_transaction("2018-09-05", "Rema")])
+
+        actual = self.store.transactions(
+            "account", start_date="2018-09-02", end_date="2018-09-09"
+        )
+
+        self.assertEqual(
+            ["2018-09-05"], [t.accounting_date.isoformat() for t in actual]
+        )
+
+    def test_latest_accounting_date(self):
+        self.store.upsert(
+            "account", [make_transaction("2018-09-01"), make_transaction("2018-09-10")]
+        )
+
+        self.assertEqual("2018-09-10", self.store.latest_accounting_date("account"))
+        self.assertIsNone(self.store.latest_accounting_date("other-account"))